@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:22:51 2026
+
+Run from the repository root:
+
+    python -m benchmarks.imports
+"""
+
+import re
+import sys
+import argparse
+import subprocess
+
+# modules that only the backends needing them may load
+HEAVY = ['tkinter', 'camelot', 'tabula', 'cv2', 'jpype', 'ghostscript']
+
+# each check imports modules in a fresh interpreter, and fails if it loads any
+# of the forbidden modules or takes more than its budget in seconds
+CHECKS = [
+    ('text reader', ['py.FileIO'], HEAVY + ['chardet', 'pdfminer', 'pytesseract', 'pdf2image'], 1.0),
+    ('pdfminer worker', ['py.PDFMinerUtils', 'py.Backends'], HEAVY + ['pytesseract', 'pdf2image'], 1.5),
+    ('batch cli', ['py.BatchIngest'], HEAVY + ['chardet', 'pdfminer', 'pytesseract', 'pdf2image'], 1.0),
+    ('ocr worker', ['py.TesseractUtils'], HEAVY, 2.0)
+]
+
+def parse_importtime(stderr):
+    """Parse the output of python -X importtime.
+
+        Returns a list of tuples of a module, its own microseconds and its
+        cumulative microseconds, in import order.
+        """
+    pattern = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+    times = []
+    for line in stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            times.append((match.group(4), int(match.group(1)), int(match.group(2))))
+
+    return times
+
+def check_imports(modules, forbidden, budget):
+    """Import modules in a fresh interpreter and check what they load.
+
+        Returns a dictionary with the seconds of the imports, the forbidden
+        modules that were loaded, and the ten slowest top level imports.
+
+        Parameters
+        ----------
+        modules : list, required
+            The modules to import, e.g. ['py.PDFMinerUtils'].
+        forbidden : list, required
+            The top level names of modules that must not be loaded.
+        budget : float, required
+            The most seconds the imports may take.
+        """
+    code = (
+        f"import sys\n"
+        f"{chr(10).join('import ' + x for x in modules)}\n"
+        f"print(' '.join(sorted({{x.split('.')[0] for x in sys.modules}})))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], capture_output = True, text = True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    loaded = set(result.stdout.split())
+    times = parse_importtime(result.stderr)
+    seconds = sum(x[1] for x in times)/1e6
+    slowest = sorted((x for x in times if '.' not in x[0]), key = lambda x: -x[2])[:10]
+
+    return {
+        'seconds': seconds,
+        'over_budget': seconds > budget,
+        'forbidden': sorted(loaded.intersection(forbidden)),
+        'slowest': [(x[0], x[2]/1e6) for x in slowest]
+    }
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Check what importing the pipeline loads and costs.")
+    parser.add_argument('--scale', type = float, default = 1.0, help = "multiply every budget, e.g. on slow disks")
+    parser.add_argument('--verbose', action = 'store_true', help = "print the slowest imports of every check")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, modules, forbidden, budget in CHECKS:
+        result = check_imports(modules, forbidden, budget*args.scale)
+        ok = not result['over_budget'] and not result['forbidden']
+        failed = failed or not ok
+        print(f"{'ok' if ok else 'FAIL':4} {name}: {result['seconds']:.3f}s of {budget*args.scale:.3f}s", end = '')
+        print(f", loaded {', '.join(result['forbidden'])}" if result['forbidden'] else '')
+        if args.verbose or not ok:
+            for module, seconds in result['slowest']:
+                print(f"       {seconds:.3f}s {module}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
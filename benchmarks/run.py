@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 11:48:09 2026
+
+Run from the repository root:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import statistics
+import tracemalloc
+import pytesseract
+import pandas as pd
+
+from pdf2image.exceptions import PDFInfoNotInstalledError
+from py import FileIO, PDFMinerUtils, TesseractUtils
+from . import synthetic
+
+def is_missing_tool(error):
+    """Whether an error says a tool a benchmark needs is missing.
+
+        Such benchmarks are skipped, while any other error is a failure of the
+        code being measured.
+        """
+    missing = (ImportError, FileNotFoundError, pytesseract.TesseractNotFoundError, PDFInfoNotInstalledError)
+    if isinstance(error, missing):
+        return True
+
+    # tabula is only imported by its own benchmark
+    tabula_errors = sys.modules.get('tabula.errors')
+
+    return tabula_errors is not None and isinstance(error, tabula_errors.JavaNotFoundError)
+
+def measure(func, repeat = 3):
+    """Time a function and measure its peak memory.
+
+        Returns a dictionary with the median and best wall seconds and the
+        median CPU seconds over repeat runs, and the peak bytes allocated by
+        Python during one further run under tracemalloc, which is kept apart
+        because tracing slows the code down.
+
+        Parameters
+        ----------
+        func : callable, required
+            A function taking no arguments.
+        repeat : int, optional
+            The number of timed runs. Defaults to 3.
+        """
+    wall, cpu = [], []
+    for _ in range(repeat):
+        start, start_cpu = time.perf_counter(), time.process_time()
+        func()
+        wall.append(time.perf_counter() - start)
+        cpu.append(time.process_time() - start_cpu)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': statistics.median(wall),
+        'best_seconds': min(wall),
+        'cpu_seconds': statistics.median(cpu),
+        'peak_bytes': peak
+    }
+
+def get_benchmarks(files, args):
+    """Build the benchmarks over the generated files.
+
+        Returns a list of tuples of a name, a function taking no arguments,
+        and the number of pages, or lines for text files, it processes.
+        """
+    pdf = PDFMinerUtils.extract_pdf_text(files['text'])
+    pdf_data = PDFMinerUtils.extract_pdf_data(pdf)
+    lines = PDFMinerUtils.disperse(pdf_data, seperator = '\n', direction = 'vertical')
+    words = PDFMinerUtils.disperse(lines, seperator = ' ', direction = 'horizontal')
+    words = words[words['text'] != '']
+    words.index = range(words.shape[0])
+
+    # the words of each line, as coalesce_rows takes them
+    line_rows = list(words.groupby(['page', 'top']).groups.values())[:args.coalesce]
+    line_keys = pd.Series(float('nan'), index = words.index)
+    for i, x in enumerate(line_rows):
+        line_keys[x] = i
+
+    def table_tabula():
+        import tabula
+        return tabula.read_pdf(files['table'], pages = 'all')
+
+    def table_camelot():
+        import camelot
+        return camelot.read_pdf(files['table'], flavor = 'lattice', pages = 'all')
+
+    return [
+        ('pdfminer_extract_pdf_text', lambda: PDFMinerUtils.extract_pdf_text(files['text']), args.pages),
+        ('pdfminer_extract_pdf_data', lambda: PDFMinerUtils.extract_pdf_data(pdf), args.pages),
+        ('disperse_vertical', lambda: PDFMinerUtils.disperse(pdf_data, '\n', 'vertical'), args.pages),
+        ('disperse_horizontal', lambda: PDFMinerUtils.disperse(lines, ' ', 'horizontal'), args.pages),
+        (
+            'coalesce_rows',
+            lambda: [PDFMinerUtils.coalesce_rows(words, x, 'horizontal') for x in line_rows],
+            len(line_rows)
+        ),
+        ('coalesce_groups', lambda: PDFMinerUtils.coalesce_groups(words, line_keys, 'horizontal'), len(line_rows)),
+        ('tesseract_extract_pdf_data', lambda: TesseractUtils.extract_pdf_data(files['scanned']), args.scanned_pages),
+        ('fileio_read_txt_lines', lambda: FileIO.read_txt_lines(files['txt']), args.txt_lines),
+        ('table_tabula', table_tabula, args.table_pages),
+        ('table_camelot', table_camelot, args.table_pages)
+    ]
+
+def run(args):
+    """Generate the synthetic files, run the benchmarks and collect the results."""
+    results = []
+    with TemporaryDirectory() as tempdir:
+        tempdir = Path(tempdir)
+        files = {
+            'text': synthetic.make_text_pdf(
+                tempdir / 'text.pdf', pages = args.pages, lines = args.lines,
+                words = args.words, seed = args.seed
+            ),
+            'scanned': synthetic.make_scanned_pdf(
+                tempdir / 'scanned.pdf', pages = args.scanned_pages, lines = args.lines,
+                words = args.words, seed = args.seed
+            ),
+            'table': synthetic.make_table_pdf(tempdir / 'table.pdf', pages = args.table_pages, seed = args.seed),
+            'txt': synthetic.make_txt(tempdir / 'export.txt', lines = args.txt_lines, seed = args.seed)
+        }
+
+        for name, func, units in get_benchmarks(files, args):
+            if args.only and not any(x in name for x in args.only):
+                continue
+            print(f"{name} ...", end = ' ', flush = True, file = sys.stderr)
+            try:
+                result = measure(func, repeat = args.repeat)
+                result['status'] = 'ok'
+                result['units'] = units
+                result['units_per_second'] = units/result['seconds'] if result['seconds'] > 0 else None
+                print(f"{result['seconds']:.3f}s", file = sys.stderr)
+            except Exception as e:
+                status = 'skipped' if is_missing_tool(e) else 'error'
+                result = {'status': status, 'error': f"{type(e).__name__}: {e}"}
+                print(status, file = sys.stderr)
+            results.append(dict(name = name, **result))
+
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'pandas': pd.__version__,
+            'settings': vars(args)
+        },
+        'results': results
+    }
+
+def compare(new, old):
+    """Compare two benchmark runs.
+
+        Returns a data frame with a row for each benchmark present in both
+        runs, giving the seconds and peak bytes of each and their ratios, new
+        over old. Ratios above 1 are regressions.
+
+        Parameters
+        ----------
+        new, old : dict, required
+            The results of run, as saved to JSON.
+        """
+    cols = ['name', 'seconds', 'peak_bytes']
+    new = pd.DataFrame([x for x in new['results'] if x['status'] == 'ok'], columns = cols)
+    old = pd.DataFrame([x for x in old['results'] if x['status'] == 'ok'], columns = cols)
+    table = new.merge(old, on = 'name', suffixes = ('_new', '_old'))
+    table['seconds_ratio'] = table['seconds_new']/table['seconds_old']
+    table['peak_ratio'] = table['peak_bytes_new']/table['peak_bytes_old']
+
+    return table
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the pipeline on synthetic pdfs.")
+    parser.add_argument('--output', default = 'benchmark_results.json', help = "the JSON file of results")
+    parser.add_argument('--compare', help = "a previous JSON file of results to compare against")
+    parser.add_argument('--pages', type = int, default = 20, help = "pages of the digital pdf")
+    parser.add_argument('--lines', type = int, default = 40, help = "lines per page")
+    parser.add_argument('--words', type = int, default = 8, help = "words per line")
+    parser.add_argument('--scanned-pages', type = int, default = 2, help = "pages of the scanned pdf")
+    parser.add_argument('--table-pages', type = int, default = 2, help = "pages of the table pdf")
+    parser.add_argument('--txt-lines', type = int, default = 20000, help = "lines of the text export")
+    parser.add_argument('--coalesce', type = int, default = 200, help = "lines coalesced")
+    parser.add_argument('--repeat', type = int, default = 3, help = "timed runs per benchmark")
+    parser.add_argument('--seed', type = int, default = 0, help = "the seed of the synthetic files")
+    parser.add_argument('--only', nargs = '*', help = "run only benchmarks whose names contain these")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    with open(args.output, 'w', encoding = 'utf-8') as fp:
+        json.dump(results, fp, indent = 2)
+
+    if args.compare:
+        with open(args.compare, encoding = 'utf-8') as fp:
+            old = json.load(fp)
+        with pd.option_context('display.width', 200):
+            print(compare(results, old).to_string(index = False))
+
+if __name__ == '__main__':
+    main()
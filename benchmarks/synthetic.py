@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:21:35 2026
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+
+import random
+import numpy as np
+
+# a vocabulary resembling the bills and payroll exports we process
+WORDS = [
+    'account', 'amount', 'balance', 'bill', 'charge', 'credit', 'customer', 'date',
+    'due', 'employee', 'gross', 'hours', 'invoice', 'net', 'number', 'paid', 'payroll',
+    'period', 'rate', 'service', 'statement', 'tax', 'total', 'usage', 'withholding'
+]
+
+def random_line(rng, words):
+    """Make a line of random words and amounts."""
+    line = [rng.choice(WORDS) for _ in range(words)]
+    line[-1] = f"{rng.uniform(0, 10000):,.2f}"
+
+    return ' '.join(line)
+
+def escape_pdf_text(text):
+    """Escape a string for a pdf literal string."""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_pdf(path, contents, width = 612, height = 792):
+    """Write a minimal pdf with one content stream per page.
+
+        The pdf uses the standard Helvetica font, which readers provide, so no
+        font is embedded.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the pdf to write.
+        contents : list, required
+            A list with the content stream of each page, as bytes.
+        width, height : int, optional
+            The size of the pages in points. Defaults to US letter.
+        """
+    n_pages = len(contents)
+    # 1 catalog, 2 pages, 3 font, then a page and a content object per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(f"{4 + 2*i} 0 R".encode() for i in range(n_pages))
+        + b"] /Count " + str(n_pages).encode() + b" >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    ]
+    for i, content in enumerate(contents):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2*i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+
+    pdf = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for num, obj in enumerate(objects, start = 1):
+        offsets.append(len(pdf))
+        pdf += f"{num} 0 obj\n".encode() + obj + b"\nendobj\n"
+
+    # cross-reference table with the byte offset of each object
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{x:010} 00000 n \n".encode() for x in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    with open(path, 'wb') as fp:
+        fp.write(pdf)
+
+    return path
+
+def make_text_pdf(path, pages = 10, lines = 40, words = 8, seed = 0):
+    """Generate a digital pdf with a text layer.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the pdf to write.
+        pages : int, optional
+            The number of pages. Defaults to 10.
+        lines : int, optional
+            The number of lines per page, the text density. Defaults to 40.
+        words : int, optional
+            The number of words per line. Defaults to 8.
+        seed : int, optional
+            The seed of the random text. Defaults to 0.
+        """
+    rng = random.Random(seed)
+    leading = min(700 / max(lines, 1), 14)
+    contents = []
+    for _ in range(pages):
+        stream = [f"BT /F1 {min(leading*0.8, 10):.1f} Tf {leading:.2f} TL 54 740 Td"]
+        for _ in range(lines):
+            stream.append(f"({escape_pdf_text(random_line(rng, words))}) Tj T*")
+        stream.append("ET")
+        contents.append("\n".join(stream).encode('latin-1'))
+
+    return write_pdf(path, contents)
+
+def make_table_pdf(path, pages = 2, rows = 20, cols = 5, seed = 0):
+    """Generate a digital pdf with one ruled table per page.
+
+        Cells are outlined, so both lattice and stream table extraction apply.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the pdf to write.
+        pages : int, optional
+            The number of pages. Defaults to 2.
+        rows : int, optional
+            The number of rows of each table, including the header. Defaults
+            to 20.
+        cols : int, optional
+            The number of columns of each table. Defaults to 5.
+        seed : int, optional
+            The seed of the random cells. Defaults to 0.
+        """
+    rng = random.Random(seed)
+    left, top, width = 54, 738, 504
+    cell_width = width / cols
+    cell_height = min(680 / rows, 20)
+    contents = []
+    for _ in range(pages):
+        stream = ["0.5 w"]
+        # the grid
+        for i in range(rows + 1):
+            y = top - i*cell_height
+            stream.append(f"{left} {y:.2f} m {left + width} {y:.2f} l S")
+        for j in range(cols + 1):
+            x = left + j*cell_width
+            stream.append(f"{x:.2f} {top} m {x:.2f} {top - rows*cell_height:.2f} l S")
+        # the cells
+        stream.append(f"BT /F1 {min(cell_height*0.5, 9):.1f} Tf")
+        for i in range(rows):
+            for j in range(cols):
+                text = WORDS[j % len(WORDS)] if i == 0 else f"{rng.uniform(0, 1000):.2f}"
+                x = left + j*cell_width + 3
+                y = top - (i + 1)*cell_height + cell_height*0.3
+                stream.append(f"1 0 0 1 {x:.2f} {y:.2f} Tm ({escape_pdf_text(text)}) Tj")
+        stream.append("ET")
+        contents.append("\n".join(stream).encode('latin-1'))
+
+    return write_pdf(path, contents)
+
+def get_font(size):
+    """Get a scalable font, or the default bitmap font on older Pillow."""
+    try:
+        return ImageFont.load_default(size = size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def make_scanned_pdf(path, pages = 2, lines = 30, words = 8, dpi = 200, skew = 1.0, noise = 0.02, seed = 0):
+    """Generate an image-only pdf resembling a scan.
+
+        Pages are drawn as images with a slight skew and speckle noise, and
+        carry no text layer.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the pdf to write.
+        pages : int, optional
+            The number of pages. Defaults to 2.
+        lines : int, optional
+            The number of lines per page. Defaults to 30.
+        words : int, optional
+            The number of words per line. Defaults to 8.
+        dpi : int, optional
+            The resolution of the page images. Defaults to 200.
+        skew : float, optional
+            The largest rotation of a page, in degrees. Defaults to 1.
+        noise : float, optional
+            The fraction of pixels flipped to black. Defaults to 0.02.
+        seed : int, optional
+            The seed of the random text and noise. Defaults to 0.
+        """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    size = (int(8.5*dpi), int(11*dpi))
+    font = get_font(int(dpi/7))
+    leading = (size[1] - 2*dpi) / max(lines, 1)
+
+    images = []
+    for _ in range(pages):
+        image = Image.new('L', size, 255)
+        draw = ImageDraw.Draw(image)
+        for i in range(lines):
+            draw.text((0.75*dpi, dpi + i*leading), random_line(rng, words), fill = 0, font = font)
+        image = image.rotate(rng.uniform(-skew, skew), fillcolor = 255)
+
+        # speckles
+        pixels = np.asarray(image).copy()
+        pixels[np_rng.random(pixels.shape) < noise] = 0
+        images.append(Image.fromarray(pixels))
+
+    images[0].save(path, 'PDF', resolution = dpi, save_all = True, append_images = images[1:])
+
+    return path
+
+def make_txt(path, lines = 10000, fields = 6, encoding = 'cp1252', seed = 0):
+    """Generate a tab-delimited text export, like those of Relativity or Kofax.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the text file to write.
+        lines : int, optional
+            The number of lines. Defaults to 10000.
+        fields : int, optional
+            The number of tab-separated fields per line. Defaults to 6.
+        encoding : str, optional
+            The encoding of the file. Defaults to 'cp1252'.
+        seed : int, optional
+            The seed of the random fields. Defaults to 0.
+        """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(lines):
+        row = [rng.choice(WORDS) for _ in range(fields - 1)] + [f"{rng.uniform(0, 10000):.2f} €"]
+        rows.append('\t'.join(row))
+
+    with open(path, 'w', encoding = encoding, newline = '\n') as fp:
+        fp.write('\n'.join(rows) + '\n')
+
+    return path
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 15 15:20:47 2026
+"""
+
+from pathlib import Path
+
+import os
+import re
+import asyncio
+import subprocess
+import weakref
+import pytesseract
+import pandas as pd
+
+from . import PDFMinerUtils, TesseractUtils
+
+# the number of pages rendered and OCRed at once across all requests
+page_limit = os.cpu_count() or 1
+page_semaphores = weakref.WeakKeyDictionary()
+
+def set_page_limit(limit):
+    """Set the number of pages rendered and OCRed at once across all requests.
+
+        Parameters
+        ----------
+        limit : int, required
+            The maximum number of concurrent pages per event loop.
+        """
+    global page_limit
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    page_limit = limit
+    page_semaphores.clear()
+
+def get_page_semaphore():
+    """Get the semaphore limiting concurrent pages on the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in page_semaphores:
+        page_semaphores[loop] = asyncio.Semaphore(page_limit)
+
+    return page_semaphores[loop]
+
+def get_executable(name):
+    """Get the command of a poppler or tesseract executable."""
+    poppler_path = TesseractUtils.get_poppler_path()
+    if name == 'tesseract':
+        return pytesseract.pytesseract.tesseract_cmd
+    if poppler_path is not None:
+        return str(Path(poppler_path) / name)
+
+    return name
+
+async def run_process(cmd, input = None):
+    """Run a command as an asyncio subprocess.
+
+        Returns the standard output of the command as bytes. The process is
+        killed if the awaiting task is cancelled or times out, and a non-zero
+        exit raises subprocess.CalledProcessError.
+
+        Parameters
+        ----------
+        cmd : list, required
+            The command and its arguments.
+        input : bytes, optional
+            The bytes written to the standard input of the command. Defaults
+            to None.
+        """
+    # one OpenMP thread per tesseract, as concurrency comes from pages
+    env = dict(os.environ)
+    env.setdefault('OMP_THREAD_LIMIT', '1')
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdin = subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout = subprocess.PIPE, stderr = subprocess.PIPE, env = env
+    )
+    try:
+        stdout, stderr = await process.communicate(input)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+
+    return stdout
+
+async def get_page_count(pdf_path):
+    """Count the pages of a pdf with poppler's pdfinfo.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        """
+    info = await run_process([get_executable('pdfinfo'), str(pdf_path)])
+    pages = re.search(r'^Pages:\s+(\d+)', info.decode('utf-8', errors = 'replace'), re.MULTILINE)
+    if pages is None:
+        raise ValueError(f"could not count the pages of {pdf_path}")
+
+    return int(pages.group(1))
+
+async def render_page(pdf_path, page_num, dpi = 500):
+    """Render a pdf page with poppler's pdftoppm.
+
+        Returns the page as uncompressed PPM bytes.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        dpi : int, optional
+            The resolution at which the page is rendered. Defaults to 500.
+        """
+    cmd = [
+        get_executable('pdftoppm'), '-r', str(dpi), '-f', str(page_num),
+        '-l', str(page_num), str(pdf_path)
+    ]
+
+    return await run_process(cmd)
+
+async def ocr_image(image, extension = None):
+    """OCR an image with tesseract, passing it through standard input.
+
+        Returns the text output of tesseract, or its TSV output if extension
+        is 'tsv'.
+
+        Parameters
+        ----------
+        image : bytes, required
+            An encoded image, e.g. as returned by render_page.
+        extension : str, optional
+            The tesseract output configuration, e.g. 'tsv'. Defaults to None
+            for plain text.
+        """
+    cmd = [get_executable('tesseract'), 'stdin', 'stdout']
+    if extension is not None:
+        cmd.append(extension)
+    output = await run_process(cmd, input = image)
+
+    return output.decode('utf-8')
+
+async def ocr_pdf_page(pdf_path, page_num, dpi = 500, output = 'text'):
+    """Render and OCR a pdf page, waiting for a free page slot first.
+
+        Returns the inferred text of the page if output is 'text', otherwise a
+        dataframe with the columns described in
+        TesseractUtils.extract_pdf_data. The TSV is parsed in the default
+        executor so the event loop is never blocked.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        dpi : int, optional
+            The resolution at which the page is rendered. Defaults to 500.
+        output : str, optional
+            A string 'text' or 'data' representing the result to return.
+            Defaults to 'text'.
+        """
+    if output not in ('text', 'data'):
+        raise ValueError("output must be either text or data")
+
+    async with get_page_semaphore():
+        image = await render_page(pdf_path, page_num, dpi = dpi)
+        if output == 'text':
+            return await ocr_image(image)
+        data = await ocr_image(image, 'tsv')
+
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(None, TesseractUtils.parse_page_data, data, page_num)
+
+async def gather_pages(coros):
+    """Run coroutines concurrently, cancelling all of them if one fails.
+
+        Returns their results in order.
+
+        Parameters
+        ----------
+        coros : list, required
+            A list of coroutines.
+        """
+    tasks = [asyncio.ensure_future(x) for x in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+        raise
+
+async def tesseract_pdf_text(pdf_path, dpi = 500, timeout = None):
+    """Convert pdf to list of strings without blocking the event loop.
+
+        Returns the same list as TesseractUtils.extract_pdf_text. Pages are
+        rendered and OCRed as asyncio subprocesses, concurrently up to the
+        limit set by set_page_limit across all requests. On cancellation or
+        timeout, all subprocesses of the request are killed.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        timeout : float, optional
+            The number of seconds after which the request is cancelled and
+            asyncio.TimeoutError is raised. Defaults to None, no timeout.
+        """
+    async def run():
+        n_pages = await get_page_count(pdf_path)
+        pages = [ocr_pdf_page(pdf_path, x, dpi = dpi, output = 'text') for x in range(1, n_pages + 1)]
+        return await gather_pages(pages)
+
+    return await asyncio.wait_for(run(), timeout)
+
+async def tesseract_pdf_data(pdf_path, dpi = 500, timeout = None):
+    """Convert pdf to a dataframe without blocking the event loop.
+
+        Returns the same dataframe as TesseractUtils.extract_pdf_data. Pages
+        are rendered and OCRed as asyncio subprocesses, concurrently up to the
+        limit set by set_page_limit across all requests. On cancellation or
+        timeout, all subprocesses of the request are killed.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        timeout : float, optional
+            The number of seconds after which the request is cancelled and
+            asyncio.TimeoutError is raised. Defaults to None, no timeout.
+        """
+    async def run():
+        n_pages = await get_page_count(pdf_path)
+        pages = [ocr_pdf_page(pdf_path, x, dpi = dpi, output = 'data') for x in range(1, n_pages + 1)]
+        return pd.concat(await gather_pages(pages))
+
+    return await asyncio.wait_for(run(), timeout)
+
+async def pdfminer_pdf_page(pdf_path, page_num, executor = None):
+    """Parse a pdf page in an executor, waiting for a free page slot first.
+
+        Returns the parsed objects of the page, as an element of the list of
+        PDFMinerUtils.extract_pdf_text.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        executor : executor, optional
+            The executor in which the page is parsed. Defaults to None, using
+            the default thread pool of the event loop.
+        """
+    loop = asyncio.get_running_loop()
+    async with get_page_semaphore():
+        pages = await loop.run_in_executor(executor, PDFMinerUtils.extract_pdf_pages, pdf_path, page_num, page_num)
+
+    return pages[0]
+
+async def pdfminer_pdf_text(pdf_path, executor = None, timeout = None):
+    """Convert layout tree to list of pdf pages without blocking the event loop.
+
+        Returns the same list as PDFMinerUtils.extract_pdf_text. Each page is
+        parsed in an executor as soon as a page slot is free, so a long pdf
+        takes no more of the limit set by set_page_limit than a short one.
+        Parsing is CPU-bound, so pass a ProcessPoolExecutor to keep it off the
+        interpreter of the event loop.
+
+        On timeout the request returns immediately and pages not yet started
+        are never parsed, but the timeout does not stop the work: pages
+        already running in the executor cannot be interrupted, and keep its
+        workers busy until they finish, after their page slots are released.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        executor : executor, optional
+            The executor in which pages are parsed. Defaults to None, using
+            the default thread pool of the event loop.
+        timeout : float, optional
+            The number of seconds after which asyncio.TimeoutError is raised.
+            Defaults to None, no timeout.
+        """
+    loop = asyncio.get_running_loop()
+
+    async def run():
+        n_pages = await loop.run_in_executor(executor, PDFMinerUtils.get_page_count, pdf_path)
+        pages = [pdfminer_pdf_page(pdf_path, x, executor = executor) for x in range(1, n_pages + 1)]
+        return await gather_pages(pages)
+
+    return await asyncio.wait_for(run(), timeout)
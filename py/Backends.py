@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:40:06 2026
+"""
+
+from importlib import import_module
+
+import os
+
+# the registered backends by name; a backend is a dictionary of its target, a
+# callable or a 'module:function' string imported on first use, and the file
+# extensions it handles
+backends = {}
+
+def register(name, target, extensions = ('.pdf',)):
+    """Register an extractor backend.
+
+        A backend is a callable taking the path of a file and keyword options,
+        e.g. dpi or chunk_size, that yields data frames. Options a backend
+        does not use are ignored.
+
+        Parameters
+        ----------
+        name : str, required
+            The name of the backend, e.g. 'pdfminer'. Replaces a backend of the
+            same name.
+        target : callable or str, required
+            The backend, or a string 'module:function' naming it, imported only
+            when the backend is first used so registering it costs nothing. A
+            callable must be importable by worker processes, i.e. a function
+            at the top level of a module.
+        extensions : tuple, optional
+            The lower case file extensions the backend handles. Defaults to
+            ('.pdf',).
+        """
+    backends[name] = {'target': target, 'extensions': tuple(extensions)}
+
+def get_backend(name):
+    """Get an extractor backend by name, importing it if needed.
+
+        Parameters
+        ----------
+        name : str, required
+            The name of a registered backend.
+        """
+    return resolve(get_target(name))
+
+def get_target(name):
+    """Get the target a backend was registered with, by name.
+
+        Worker processes started with spawn, as on Windows, import a fresh
+        registry without the backends registered in the parent, so the
+        parent passes them the target rather than the name.
+
+        Parameters
+        ----------
+        name : str, required
+            The name of a registered backend.
+        """
+    if name not in backends:
+        raise ValueError(f"unknown backend {name}, one of {', '.join(backends)}")
+
+    return backends[name]['target']
+
+def resolve(target):
+    """Get the callable of a target, importing a 'module:function' string."""
+    if isinstance(target, str):
+        module, func = target.split(':')
+        return getattr(import_module(module, __package__), func)
+
+    return target
+
+def list_backends(extension = None):
+    """List the names of the registered backends.
+
+        Parameters
+        ----------
+        extension : str, optional
+            A file extension, e.g. '.pdf', to list only the backends handling
+            it. Defaults to None, listing all.
+        """
+    if extension is None:
+        return list(backends)
+
+    return [x for x, backend in backends.items() if extension.lower() in backend['extensions']]
+
+def init_worker(omp_thread_limit = 1):
+    """Limit the OpenMP threads Tesseract uses in a worker process.
+
+        As TesseractUtils.init_ocr_worker, without importing the OCR modules
+        into workers that never OCR.
+
+        Parameters
+        ----------
+        omp_thread_limit : int, optional
+            The number of OpenMP threads each Tesseract call may use. Defaults
+            to 1.
+        """
+    os.environ['OMP_THREAD_LIMIT'] = str(omp_thread_limit)
+
+# built in backends, each importing its modules only when called
+
+def extract_hybrid(file_path, dpi = 500, **options):
+    """Use the text layer of pages that have one and OCR elsewhere."""
+    from . import HybridUtils
+    yield HybridUtils.extract_pdf_data(file_path, dpi = dpi)
+
+def extract_pdfminer(file_path, **options):
+    """Use the text layer with PDFMiner."""
+    from . import PDFMinerUtils
+    yield PDFMinerUtils.extract_pdf_data(PDFMinerUtils.extract_pdf_layout(file_path))
+
+def extract_pdfminer_lines(file_path, **options):
+    """Use the text layer with PDFMiner, a row for each line of text."""
+    from . import PDFMinerUtils
+    yield PDFMinerUtils.extract_pdf_lines(file_path)
+
+def extract_tesseract(file_path, **options):
+    """OCR every page with Tesseract."""
+    from . import TesseractUtils
+    yield TesseractUtils.extract_pdf_data(file_path)
+
+def extract_tables(file_path, **options):
+    """Extract tables as a data frame of cells with camelot lattice."""
+    from . import TableUtils
+    cells, timings = TableUtils.extract_camelot([file_path], workers = 1)
+    if timings['error'].notna().any():
+        raise RuntimeError(timings['error'].iloc[0])
+    yield cells.drop(columns = 'source')
+
+def extract_txt(file_path, chunk_size = 100000, **options):
+    """Read a delimited text export in chunks of lines.
+
+        Every chunk has the columns field_0 to field_<n - 1> as strings, n
+        being the most fields on any line, so all parts share one schema. The
+        file is read once to count the fields before the chunks are read.
+        """
+    from . import FileIO
+    encoding = FileIO.detect_encoding(file_path)
+    width = max((len(x) for x in FileIO.iter_txt_lines(file_path, encoding = encoding)), default = 0)
+    for chunk in FileIO.iter_txt_frames(file_path, chunk_size = chunk_size, encoding = encoding):
+        chunk = chunk.reindex(columns = range(width)).astype('string')
+        chunk.columns = [f'field_{i}' for i in range(width)]
+        yield chunk
+
+register('hybrid', extract_hybrid)
+register('pdfminer', extract_pdfminer)
+register('pdfminer_lines', extract_pdfminer_lines)
+register('tesseract', extract_tesseract)
+register('tables', extract_tables)
+register('txt', extract_txt, extensions = ('.txt', '.tsv', '.dat'))
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:26:14 2026
+
+Run from the repository root, e.g.:
+
+    python -m py.BatchIngest C:/corpus C:/output --workers 8
+"""
+
+from pathlib import Path
+from importlib import import_module
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import pandas as pd
+
+from . import Backends, FileIO
+
+def route_file(file_path, pdf_extractor = 'hybrid'):
+    """Choose the extractor of a file by its extension.
+
+        Returns the name of the backend, or None if the file is not ingested.
+
+        Parameters
+        ----------
+        file_path : str, required
+            The path of a file.
+        pdf_extractor : str, optional
+            The backend of pdfs, one of Backends.list_backends('.pdf'). Defaults
+            to 'hybrid', using the text layer of pages that have one and OCR
+            elsewhere.
+        """
+    extension = Path(file_path).suffix.lower()
+    if extension == '.pdf':
+        return pdf_extractor
+    names = Backends.list_backends(extension)
+
+    return names[0] if names else None
+
+def get_doc_id(file_path):
+    """Get a stable identifier of a file from its absolute path."""
+    return hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()[:20]
+
+def check_parquet_engine():
+    """Raise an ImportError at once if pandas has no Parquet engine.
+
+        Without one, every file would fail to write and be recorded as failed.
+        """
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            import_module(engine)
+            return engine
+        except ImportError:
+            continue
+
+    raise ImportError("writing Parquet requires pyarrow or fastparquet, e.g. pip install pyarrow")
+
+def write_part(data, part_path):
+    """Write a data frame to a Parquet file atomically."""
+    temp_path = part_path.with_name(part_path.name + f'.{os.getpid()}.tmp')
+    data.to_parquet(temp_path, index = False)
+    os.replace(temp_path, part_path)
+
+def ingest_file(file_path, extractor, output_dir, dpi = 500, chunk_size = 100000, backend = None):
+    """Extract a file and write its data as Parquet parts.
+
+        Data is written to output_dir/extractor=<extractor>/, in one part per
+        data frame named after the document id, with the columns doc_id and
+        source added. Parts are written to output_dir/_staging/<doc_id>/ and
+        moved into the dataset only once the whole file succeeded, so a file
+        that fails partway leaves no parts behind. Parts left by an earlier
+        attempt at the same file are replaced.
+
+        Returns a dictionary with the number of rows, parts and seconds.
+
+        Parameters
+        ----------
+        file_path : str, required
+            The absolute path of a file.
+        extractor : str, required
+            The name of a backend in Backends.
+        output_dir : str, required
+            The folder of the partitioned dataset.
+        dpi : int, optional
+            The resolution at which the hybrid extractor renders pages for OCR.
+            Defaults to 500.
+        chunk_size : int, optional
+            The number of lines of a text file per part. Defaults to 100000.
+        backend : callable or str, optional
+            The target of the backend, as Backends.get_target returns it.
+            Defaults to None, looking the extractor up in Backends.
+        """
+    start = time.perf_counter()
+    doc_id = get_doc_id(file_path)
+    partition = Path(output_dir) / f'extractor={extractor}'
+    partition.mkdir(parents = True, exist_ok = True)
+    for old in partition.glob(f'part-{doc_id}-*.parquet'):
+        old.unlink()
+    # pyarrow skips folders starting with an underscore when reading the dataset
+    staging = Path(output_dir) / '_staging' / doc_id
+    shutil.rmtree(staging, ignore_errors = True)
+    staging.mkdir(parents = True)
+
+    rows = 0
+    parts = 0
+    backend = Backends.get_backend(extractor) if backend is None else Backends.resolve(backend)
+    try:
+        for data in backend(file_path, dpi = dpi, chunk_size = chunk_size):
+            data = data.reset_index(drop = True)
+            data.insert(0, 'source', str(file_path))
+            data.insert(0, 'doc_id', doc_id)
+            write_part(data, staging / f'part-{doc_id}-{parts:05}.parquet')
+            rows = rows + data.shape[0]
+            parts = parts + 1
+        for part in sorted(staging.glob('*.parquet')):
+            os.replace(part, partition / part.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors = True)
+
+    return {'rows': rows, 'parts': parts, 'seconds': time.perf_counter() - start}
+
+class Manifest:
+    """A checkpoint manifest of ingested files in SQLite.
+
+        Each file is recorded with its size and modification time when it
+        finishes, so a later run skips files that are done and unchanged.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the SQLite database. Created if needed.
+        """
+    def __init__(self, path):
+        self.con = sqlite3.connect(path)
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, doc_id TEXT, size INTEGER, mtime_ns INTEGER, "
+            "extractor TEXT, status TEXT, rows INTEGER, parts INTEGER, seconds REAL, "
+            "error TEXT, finished REAL)"
+        )
+        self.con.commit()
+
+    def is_done(self, file_path, retry_failed = False):
+        """Whether a file is unchanged since it was ingested, or failed."""
+        row = self.con.execute(
+            "SELECT size, mtime_ns, status FROM files WHERE path = ?", (str(file_path),)
+        ).fetchone()
+        if row is None:
+            return False
+        stat = os.stat(file_path)
+        if (row[0], row[1]) != (stat.st_size, stat.st_mtime_ns):
+            return False
+
+        return row[2] == 'done' or (row[2] == 'failed' and not retry_failed)
+
+    def record(self, file_path, extractor, status, result = None, error = None):
+        """Record the outcome of a file."""
+        stat = os.stat(file_path)
+        result = result or {}
+        self.con.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(file_path), get_doc_id(file_path), stat.st_size, stat.st_mtime_ns,
+                extractor, status, result.get('rows'), result.get('parts'),
+                result.get('seconds'), error, time.time()
+            )
+        )
+        self.con.commit()
+
+    def summary(self):
+        """Count the files by status and extractor."""
+        return pd.read_sql_query(
+            "SELECT status, extractor, COUNT(*) AS files, SUM(rows) AS rows, "
+            "SUM(seconds) AS seconds FROM files GROUP BY status, extractor",
+            self.con
+        )
+
+    def close(self):
+        self.con.close()
+
+def ingest_directory(input_dir, output_dir, workers = None, pdf_extractor = 'hybrid', dpi = 500,
+                     chunk_size = 100000, retry_failed = False, log = None, max_restarts = 3):
+    """Ingest every file of a directory tree into a partitioned Parquet dataset.
+
+        Files are walked with FileIO.absolute_file_paths, routed by
+        route_file, and ingested across a process pool, each as soon as a
+        worker is free. Finished files are recorded in the manifest
+        output_dir/_manifest.sqlite as they complete, so a run that is killed
+        resumes where it stopped. The underscore keeps pyarrow from reading
+        the manifest as part of the dataset. Files that fail are recorded with their
+        error and skipped by later runs unless retry_failed is True. If a
+        worker process dies, e.g. out of memory, the files in flight are not
+        recorded, and are submitted again to a new pool.
+
+        Returns the summary of the manifest.
+
+        Parameters
+        ----------
+        input_dir : str, required
+            The root folder of the files.
+        output_dir : str, required
+            The folder of the dataset and the manifest.
+        workers : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
+        pdf_extractor : str, optional
+            The backend of pdfs, one of Backends.list_backends('.pdf').
+            Defaults to 'hybrid'.
+        dpi : int, optional
+            The resolution at which the hybrid extractor renders pages for OCR.
+            Defaults to 500.
+        chunk_size : int, optional
+            The number of lines of a text file per part. Defaults to 100000.
+        retry_failed : bool, optional
+            A boolean whether files that failed before are tried again.
+            Defaults to False.
+        log : file, optional
+            A file to which progress is written. Defaults to None.
+        max_restarts : int, optional
+            The number of times the pool is restarted after a worker process
+            dies, before a RuntimeError is raised. Files in flight are then
+            left unrecorded, for the next run. Defaults to 3.
+        """
+    if pdf_extractor not in Backends.list_backends('.pdf'):
+        raise ValueError(f"pdf_extractor must be one of {', '.join(Backends.list_backends('.pdf'))}")
+    check_parquet_engine()
+
+    Path(output_dir).mkdir(parents = True, exist_ok = True)
+    manifest = Manifest(Path(output_dir) / '_manifest.sqlite')
+    workers = workers or os.cpu_count() or 1
+
+    def todo():
+        for file_path in FileIO.absolute_file_paths(input_dir):
+            extractor = route_file(file_path, pdf_extractor)
+            if extractor is not None and not manifest.is_done(file_path, retry_failed):
+                yield file_path, extractor
+
+    files = todo()
+    # files in flight when a worker process died, submitted again first
+    retry = []
+    done_count = 0
+    restarts = 0
+    try:
+        while True:
+            broken = []
+            executor = ProcessPoolExecutor(max_workers = workers, initializer = Backends.init_worker)
+            try:
+                pending = dict()
+                while True:
+                    # keep a bounded number of files in flight while walking
+                    while len(pending) < 2 * workers and not broken:
+                        item = retry.pop(0) if retry else next(files, None)
+                        if item is None:
+                            break
+                        try:
+                            future = executor.submit(
+                                ingest_file, item[0], item[1], output_dir, dpi, chunk_size, 
+                                Backends.get_target(item[1])
+                            )
+                        except BrokenProcessPool:
+                            broken.append(item)
+                            break
+                        pending[future] = item
+                    if not pending:
+                        break
+
+                    finished, _ = wait(pending, return_when = FIRST_COMPLETED)
+                    for future in finished:
+                        file_path, extractor = pending.pop(future)
+                        try:
+                            manifest.record(file_path, extractor, 'done', result = future.result())
+                        except BrokenProcessPool:
+                            # a worker died, e.g. out of memory; the file is not at fault
+                            broken.append((file_path, extractor))
+                            continue
+                        except Exception as e:
+                            manifest.record(file_path, extractor, 'failed', error = f"{type(e).__name__}: {e}")
+                        done_count = done_count + 1
+                        if log is not None:
+                            print(f"[{done_count}] {extractor} {file_path}", file = log, flush = True)
+            finally:
+                executor.shutdown(cancel_futures = True)
+
+            if not broken:
+                break
+            restarts = restarts + 1
+            if restarts > max_restarts:
+                raise RuntimeError(
+                    f"worker processes died {restarts} times; the {len(broken)} file(s) in flight were "
+                    "left unrecorded and are retried by the next run"
+                )
+            if log is not None:
+                print(f"a worker process died, restarting the pool with {len(broken)} file(s) in flight", 
+                      file = log, flush = True)
+            retry.extend(broken)
+
+        return manifest.summary()
+    finally:
+        manifest.close()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        description = "Ingest a directory tree of pdfs and text exports into partitioned Parquet."
+    )
+    parser.add_argument('input_dir', help = "the root folder of the files")
+    parser.add_argument('output_dir', help = "the folder of the dataset and its manifest")
+    parser.add_argument('--workers', type = int, default = None, help = "worker processes, one per core by default")
+    parser.add_argument('--pdf-extractor', default = 'hybrid', choices = Backends.list_backends('.pdf'), help = "the extractor of pdfs")
+    parser.add_argument('--dpi', type = int, default = 500, help = "the resolution of pages rendered for OCR")
+    parser.add_argument('--chunk-size', type = int, default = 100000, help = "lines of a text file per part")
+    parser.add_argument('--retry-failed', action = 'store_true', help = "try files that failed before again")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = ingest_directory(
+            args.input_dir, args.output_dir, workers = args.workers, pdf_extractor = args.pdf_extractor,
+            dpi = args.dpi, chunk_size = args.chunk_size, retry_failed = args.retry_failed, log = sys.stderr
+        )
+    except RuntimeError as e:
+        print(e, file = sys.stderr)
+        sys.exit(1)
+    print(summary.to_string(index = False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:12:40 2026
+
+Run from the repository root, e.g. on one machine with the SQLite queue:
+
+    python -m py.DistributedOCR submit C:/ocr/queue.sqlite C:/ocr/pages S:/scans/*.pdf
+    python -m py.DistributedOCR work C:/ocr/queue.sqlite --processes 8
+    python -m py.DistributedOCR collect C:/ocr/queue.sqlite C:/ocr/output
+
+The SQLite queue is local only. Spreading workers over several machines needs
+another WorkQueue backend, on a service every node can reach, added to queues.
+"""
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import os
+import sys
+import glob
+import json
+import time
+import uuid
+import socket
+import inspect
+import sqlite3
+import argparse
+import pandas as pd
+
+from . import Backends
+
+class WorkQueue:
+    """The interface of a work queue of page-range tasks.
+
+        A task is a dictionary with the keys task_id, submission, pdf_path,
+        first_page, last_page, engine, results_dir, options and attempts. A
+        worker leases a task for a number of seconds, renews the lease while
+        it works, and completes or fails it. A task whose lease runs out, e.g.
+        because its worker died, is leased again, until it has been attempted
+        max_attempts times.
+
+        Queues are opened by location with open_queue, so each worker process
+        opens its own connection.
+        """
+    def put(self, tasks):
+        """Add tasks, given as dictionaries without task_id and attempts."""
+        raise NotImplementedError
+
+    def lease(self, worker, lease_seconds):
+        """Lease the next available task to a worker, or return None."""
+        raise NotImplementedError
+
+    def renew(self, task_id, worker, lease_seconds):
+        """Extend a lease, returning False if the worker no longer holds it."""
+        raise NotImplementedError
+
+    def complete(self, task_id, worker):
+        """Mark a leased task done."""
+        raise NotImplementedError
+
+    def fail(self, task_id, worker, error):
+        """Release a leased task for a retry, or mark it failed."""
+        raise NotImplementedError
+
+    def unfinished(self):
+        """Count the tasks that are neither done nor failed."""
+        raise NotImplementedError
+
+    def tasks(self):
+        """List every task with its status, as a data frame."""
+        raise NotImplementedError
+
+class SQLiteQueue(WorkQueue):
+    """A work queue in an SQLite database on a local disk.
+
+        Leases are taken in immediate transactions, so workers in any number
+        of processes on this machine never lease the same task at once. The
+        database must not be on a network share, e.g. SMB or NFS, shared by
+        several machines, as SQLite's file locks are unreliable there; use
+        another WorkQueue backend for workers on several machines.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the database. Created if needed.
+        max_attempts : int, optional
+            The number of times a task is attempted before it is marked
+            failed. Defaults to 3.
+        retry_delay : float, optional
+            The seconds a failed task waits before it is leased again.
+            Defaults to 30.
+        """
+    def __init__(self, path, max_attempts = 3, retry_delay = 30):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.con = sqlite3.connect(self.path, timeout = 60, isolation_level = None)
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id INTEGER PRIMARY KEY, submission TEXT, pdf_path TEXT, first_page INTEGER, last_page INTEGER, "
+            "engine TEXT, results_dir TEXT, options TEXT, status TEXT, attempts INTEGER, "
+            "available REAL, lease_until REAL, worker TEXT, error TEXT, finished REAL)"
+        )
+        self.con.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, available)")
+
+    def put(self, tasks):
+        self.con.execute("BEGIN IMMEDIATE")
+        self.con.executemany(
+            "INSERT INTO tasks (submission, pdf_path, first_page, last_page, engine, results_dir, options, "
+            "status, attempts, available) VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', 0, 0)",
+            [
+                (
+                    x['submission'], str(x['pdf_path']), x['first_page'], x['last_page'], x['engine'],
+                    str(x['results_dir']), json.dumps(x.get('options', {}))
+                )
+                for x in tasks
+            ]
+        )
+        self.con.execute("COMMIT")
+
+    def lease(self, worker, lease_seconds):
+        now = time.time()
+        self.con.execute("BEGIN IMMEDIATE")
+        try:
+            # leases that ran out on their last attempt fail for good
+            self.con.execute(
+                "UPDATE tasks SET status = 'failed', error = 'lease expired', finished = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self.con.execute(
+                "SELECT task_id, submission, pdf_path, first_page, last_page, engine, results_dir, options, "
+                "attempts "
+                "FROM tasks WHERE (status = 'pending' AND available <= ?) "
+                "OR (status = 'leased' AND lease_until < ?) ORDER BY task_id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is not None:
+                self.con.execute(
+                    "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_until = ?, "
+                    "worker = ? WHERE task_id = ?",
+                    (now + lease_seconds, worker, row[0])
+                )
+            self.con.execute("COMMIT")
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        keys = [
+            'task_id', 'submission', 'pdf_path', 'first_page', 'last_page', 'engine', 'results_dir', 
+            'options', 'attempts'
+        ]
+        task = dict(zip(keys, row))
+        task['options'] = json.loads(task['options'])
+        task['attempts'] = task['attempts'] + 1
+
+        return task
+
+    def renew(self, task_id, worker, lease_seconds):
+        cursor = self.con.execute(
+            "UPDATE tasks SET lease_until = ? WHERE task_id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, task_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id, worker):
+        self.con.execute(
+            "UPDATE tasks SET status = 'done', worker = ?, error = NULL, finished = ? "
+            "WHERE task_id = ? AND status != 'done'",
+            (worker, time.time(), task_id)
+        )
+
+    def fail(self, task_id, worker, error):
+        now = time.time()
+        self.con.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "available = ?, error = ?, finished = CASE WHEN attempts >= ? THEN ? END "
+            "WHERE task_id = ? AND worker = ? AND status = 'leased'",
+            (self.max_attempts, now + self.retry_delay, error, self.max_attempts, now, task_id, worker)
+        )
+
+    def unfinished(self):
+        return self.con.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def tasks(self):
+        return pd.read_sql_query(
+            "SELECT task_id, submission, pdf_path, first_page, last_page, engine, results_dir, status, "
+            "attempts, worker, error FROM tasks ORDER BY task_id",
+            self.con
+        )
+
+    def close(self):
+        self.con.close()
+
+# queue backends by the scheme of their location, e.g. sqlite://S:/ocr/queue.sqlite
+queues = {'sqlite': SQLiteQueue}
+
+def open_queue(location, **kwargs):
+    """Open a work queue by its location.
+
+        Parameters
+        ----------
+        location : str, required
+            A string 'scheme://path' naming a backend in queues, or the path of
+            an SQLite database on a local disk.
+        kwargs : keyword arguments, optional
+            Additional arguments of the backend, e.g. max_attempts.
+        """
+    location = str(location)
+    scheme, sep, path = location.partition('://')
+    if not sep:
+        return SQLiteQueue(location, **kwargs)
+    if scheme not in queues:
+        raise ValueError(f"unknown queue scheme {scheme}, one of {', '.join(queues)}")
+
+    return queues[scheme](path, **kwargs)
+
+# per-page extraction by engine; each yields the page number and data of the
+# pages of a range, importing its modules only when called
+
+def extract_tesseract_pages(pdf_path, first_page, last_page, dpi = 500, grayscale = False):
+    """OCR a page range with Tesseract, as TesseractUtils.extract_pdf_data does."""
+    from . import TesseractUtils
+    for page_num in range(first_page, last_page + 1):
+        yield page_num, TesseractUtils.ocr_pdf_page(pdf_path, page_num, dpi = dpi, output = 'data', grayscale = grayscale)
+
+def extract_pdfminer_pages(pdf_path, first_page, last_page):
+    """Extract a page range with PDFMiner, as PDFMinerUtils.extract_pdf_data does."""
+    from . import PDFMinerUtils
+    pages = PDFMinerUtils.iter_pdf_text(pdf_path, first_page = first_page, last_page = last_page)
+    for page_num, page in enumerate(pages, start = first_page):
+        data = PDFMinerUtils.get_page_data(page)
+        data.insert(0, "page", page_num)
+        yield page_num, data
+
+engines = {'tesseract': extract_tesseract_pages, 'pdfminer': extract_pdfminer_pages}
+
+def get_doc_dir(results_dir, submission, pdf_path):
+    """Get the folder of the page results of a pdf in a submission.
+
+        Each submission writes to a folder of its own, so resubmitting a pdf,
+        e.g. after it changed or with another engine or options, never reuses
+        pages of an earlier submission.
+        """
+    from .BatchIngest import get_doc_id
+
+    return Path(results_dir) / submission / get_doc_id(pdf_path)
+
+def get_page_path(results_dir, submission, pdf_path, page_num):
+    """Get the path of the result of a pdf page in a submission."""
+    return get_doc_dir(results_dir, submission, pdf_path) / f'page-{page_num:05}.parquet'
+
+def get_latest_tasks(tasks):
+    """Select the tasks of the latest submission of each pdf."""
+    latest = tasks.groupby('pdf_path')['task_id'].transform('max')
+    latest = tasks.loc[tasks['task_id'] == latest, ['pdf_path', 'submission']]
+
+    return tasks.merge(latest, on = ['pdf_path', 'submission'])
+
+def submit(queue, pdf_paths, results_dir, engine = 'tesseract', pages_per_task = 10, **options):
+    """Split pdfs into page-range tasks and put them on a queue.
+
+        Returns a data frame with a row for each pdf and the columns
+        submission, pdf_path, pages, tasks and error, the error of a pdf whose
+        pages could not be counted, in which case it has no tasks. Every call
+        is a new submission, whose results are kept apart from earlier ones.
+
+        Parameters
+        ----------
+        queue : WorkQueue or str, required
+            A work queue, or its location as open_queue takes it.
+        pdf_paths : list, required
+            A list of the absolute paths of pdf documents, readable by every
+            worker.
+        results_dir : str, required
+            The folder, readable and writable by every worker, holding the
+            result of each page.
+        engine : str, optional
+            A string 'tesseract' or 'pdfminer', or another key of engines.
+            Defaults to 'tesseract'.
+        pages_per_task : int, optional
+            The number of pages of each task. Defaults to 10.
+        options : keyword arguments, optional
+            Options of the engine, e.g. dpi, as JSON serializable values. An
+            option the engine does not take raises a ValueError here, rather
+            than failing every task in the workers.
+        """
+    from . import PDFMinerUtils
+
+    if engine not in engines:
+        raise ValueError(f"engine must be one of {', '.join(engines)}")
+    accepted = list(inspect.signature(engines[engine]).parameters)[3:]
+    unknown = [x for x in options if x not in accepted]
+    if unknown:
+        raise ValueError(
+            f"engine {engine} does not take {', '.join(unknown)}; its options are {', '.join(accepted) or 'none'}"
+        )
+    if isinstance(queue, str):
+        queue = open_queue(queue)
+
+    submission = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    tasks, summary = [], []
+    for pdf_path in pdf_paths:
+        try:
+            n_pages = PDFMinerUtils.get_page_count(pdf_path)
+        except Exception as e:
+            summary.append({
+                'submission': submission, 'pdf_path': str(pdf_path), 'pages': 0, 'tasks': 0, 
+                'error': f"{type(e).__name__}: {e}"
+            })
+            continue
+        doc_tasks = [
+            {
+                'submission': submission, 'pdf_path': pdf_path, 'first_page': x, 
+                'last_page': min(x + pages_per_task - 1, n_pages), 'engine': engine, 
+                'results_dir': results_dir, 'options': options
+            }
+            for x in range(1, n_pages + 1, pages_per_task)
+        ]
+        tasks.extend(doc_tasks)
+        summary.append({
+            'submission': submission, 'pdf_path': str(pdf_path), 'pages': n_pages, 'tasks': len(doc_tasks),
+            'error': None
+        })
+    queue.put(tasks)
+
+    return pd.DataFrame(summary, columns = ['submission', 'pdf_path', 'pages', 'tasks', 'error'])
+
+def run_task(queue, task, worker, lease_seconds):
+    """Extract the pages of a task, writing the result of each page.
+
+        Pages written by an earlier attempt at the same submission are
+        skipped. Returns False if the lease was lost to another worker, in
+        which case the task is left to it.
+        """
+    extract = engines[task['engine']]
+    location = (task['results_dir'], task['submission'], task['pdf_path'])
+    first_page = task['first_page']
+    while first_page <= task['last_page'] and get_page_path(*location, first_page).exists():
+        first_page = first_page + 1
+    if first_page > task['last_page']:
+        return True
+
+    get_doc_dir(*location).mkdir(parents = True, exist_ok = True)
+    for page_num, data in extract(task['pdf_path'], first_page, task['last_page'], **task['options']):
+        page_path = get_page_path(*location, page_num)
+        temp_path = page_path.with_name(f'{page_path.name}.{worker}.tmp')
+        data.to_parquet(temp_path)
+        os.replace(temp_path, page_path)
+        if not queue.renew(task['task_id'], worker, lease_seconds):
+            return False
+
+    return True
+
+def run_worker(location, lease_seconds = 300, idle_seconds = 0, poll_seconds = 5, max_tasks = None,
+               queue_options = None):
+    """Lease and run tasks from a queue until every task is done or failed.
+
+        While no task can be leased but some are unfinished, e.g. waiting to
+        be retried or leased to other workers, the worker polls the queue, so
+        it takes over the tasks of workers that die.
+
+        Returns the number of tasks completed.
+
+        Parameters
+        ----------
+        location : str, required
+            The location of the queue, as open_queue takes it.
+        lease_seconds : int, optional
+            The seconds a task is leased for, renewed after every page. A task
+            whose worker stops renewing is leased to another worker after
+            them. Defaults to 300.
+        idle_seconds : float, optional
+            The seconds to keep polling a queue without unfinished tasks
+            before stopping, e.g. while a coordinator is still submitting.
+            Defaults to 0.
+        poll_seconds : float, optional
+            The seconds between polls when no task can be leased. Defaults
+            to 5.
+        max_tasks : int, optional
+            The most tasks to run. Defaults to None, no limit.
+        queue_options : dict, optional
+            Additional arguments of the queue backend, e.g. max_attempts.
+            Defaults to None.
+        """
+    from .BatchIngest import check_parquet_engine
+
+    check_parquet_engine()
+    queue = open_queue(location, **(queue_options or {}))
+    worker = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+    completed = 0
+    idle_since = None
+    try:
+        while max_tasks is None or completed < max_tasks:
+            task = queue.lease(worker, lease_seconds)
+            if task is None:
+                if queue.unfinished() == 0:
+                    idle_since = idle_since or time.monotonic()
+                    if time.monotonic() - idle_since >= idle_seconds:
+                        break
+                else:
+                    idle_since = None
+                time.sleep(poll_seconds)
+                continue
+            idle_since = None
+
+            try:
+                if run_task(queue, task, worker, lease_seconds):
+                    queue.complete(task['task_id'], worker)
+                    completed = completed + 1
+            except Exception as e:
+                queue.fail(task['task_id'], worker, f"{type(e).__name__}: {e}")
+    finally:
+        queue.close()
+
+    return completed
+
+def run_workers(location, processes = None, **kwargs):
+    """Run workers in several processes of this machine.
+
+        Returns the number of tasks completed by all of them.
+
+        Parameters
+        ----------
+        location : str, required
+            The location of the queue, as open_queue takes it.
+        processes : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
+        kwargs : keyword arguments, optional
+            Additional arguments of run_worker.
+        """
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers = processes, initializer = Backends.init_worker) as executor:
+        futures = [executor.submit(run_worker, location, **kwargs) for _ in range(processes)]
+
+        return sum(x.result() for x in futures)
+
+def assemble(queue, pdf_path):
+    """Reassemble the page results of a pdf into one data frame.
+
+        Only the latest submission of the pdf is read. Returns the data frame
+        extract_pdf_data of the engine returns, or None if any task of that
+        submission is not done.
+
+        Parameters
+        ----------
+        queue : WorkQueue or str, required
+            A work queue, or its location as open_queue takes it.
+        pdf_path : str, required
+            The absolute path of a pdf submitted to the queue.
+        """
+    if isinstance(queue, str):
+        queue = open_queue(queue)
+    tasks = queue.tasks()
+    tasks = get_latest_tasks(tasks[tasks['pdf_path'] == str(pdf_path)])
+    if tasks.shape[0] == 0 or (tasks['status'] != 'done').any():
+        return None
+
+    location = (tasks['results_dir'].iloc[0], tasks['submission'].iloc[0], str(pdf_path))
+    pages = range(1, int(tasks['last_page'].max()) + 1)
+    data = pd.concat([pd.read_parquet(get_page_path(*location, x)) for x in pages])
+    if tasks['engine'].iloc[0] == 'pdfminer':
+        data.index = range(data.shape[0])
+
+    return data
+
+def get_status(queue):
+    """Count the tasks of a queue by status, and the documents whose latest
+    submission is fully done."""
+    tasks = queue.tasks()
+    counts = tasks['status'].value_counts().to_dict()
+    docs = get_latest_tasks(tasks).groupby('pdf_path')['status'].agg(lambda x: (x == 'done').all())
+    counts['documents_done'] = int(docs.sum())
+    counts['documents'] = int(docs.shape[0])
+
+    return counts
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Distributed, page-sharded OCR over a shared work queue.")
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    command = commands.add_parser('submit', help = "split pdfs into page-range tasks")
+    command.add_argument('queue', help = "the queue location, e.g. the path of an SQLite database on a local disk")
+    command.add_argument('results_dir', help = "the folder of page results, writable by every worker")
+    command.add_argument('pdf_paths', nargs = '+', help = "the pdfs or patterns, e.g. S:/scans/*.pdf, at paths every worker can read")
+    command.add_argument('--engine', default = 'tesseract', choices = list(engines), help = "the extraction engine")
+    command.add_argument('--pages-per-task', type = int, default = 10, help = "pages of each task")
+    command.add_argument('--dpi', type = int, default = None, help = "the resolution of pages rendered for OCR")
+
+    command = commands.add_parser('work', help = "run workers on this machine until the queue runs dry")
+    command.add_argument('queue', help = "the queue location")
+    command.add_argument('--processes', type = int, default = None, help = "worker processes, one per core by default")
+    command.add_argument('--lease-seconds', type = int, default = 300, help = "the lease of a task, renewed every page")
+    command.add_argument('--idle-seconds', type = float, default = 0, help = "seconds to wait on an empty queue")
+
+    command = commands.add_parser('status', help = "count the tasks by status")
+    command.add_argument('queue', help = "the queue location")
+
+    command = commands.add_parser('collect', help = "write each finished pdf as one Parquet file")
+    command.add_argument('queue', help = "the queue location")
+    command.add_argument('output_dir', help = "the folder of the assembled data")
+    args = parser.parse_args(argv)
+
+    if args.command == 'submit':
+        # cmd on Windows passes patterns through unexpanded; one matching
+        # nothing is kept, so the summary reports it
+        pdf_paths = []
+        for x in args.pdf_paths:
+            pdf_paths.extend((sorted(glob.glob(x)) or [x]) if glob.has_magic(x) else [x])
+        options = {} if args.dpi is None else {'dpi': args.dpi}
+        try:
+            summary = submit(
+                args.queue, [str(Path(x).resolve()) for x in pdf_paths], str(Path(args.results_dir).resolve()),
+                engine = args.engine, pages_per_task = args.pages_per_task, **options
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        print(summary.to_string(index = False))
+    elif args.command == 'work':
+        completed = run_workers(
+            args.queue, processes = args.processes, lease_seconds = args.lease_seconds,
+            idle_seconds = args.idle_seconds
+        )
+        print(f"completed {completed} tasks", file = sys.stderr)
+    elif args.command == 'status':
+        print(json.dumps(get_status(open_queue(args.queue)), indent = 2))
+    elif args.command == 'collect':
+        from .BatchIngest import check_parquet_engine, get_doc_id
+
+        check_parquet_engine()
+        queue = open_queue(args.queue)
+        Path(args.output_dir).mkdir(parents = True, exist_ok = True)
+        for pdf_path in queue.tasks()['pdf_path'].unique():
+            data = assemble(queue, pdf_path)
+            if data is not None:
+                data.to_parquet(Path(args.output_dir) / f'{get_doc_id(pdf_path)}.parquet')
+
+if __name__ == '__main__':
+    main()
@@ -12,10 +12,12 @@ def absolute_file_paths(directory):
         for f in filenames:
             yield os.path.abspath(os.path.join(dirpath, f))
 
-from tkinter import Tk
-from tkinter.filedialog import askdirectory
 def choose_directory(msg):
     """prompt the user to pick a directory with a message"""
+    # tkinter is only imported when a dialog is shown, not by headless workers
+    from tkinter import Tk
+    from tkinter.filedialog import askdirectory
+    
     # Create Tkinter root window
     root = Tk()
     root.withdraw()  # Hide the root window
@@ -25,26 +27,95 @@ def choose_directory(msg):
     
     return directory
 
-import chardet
-def read_txt_lines(txt_path):
-    """read lines of a text file to a list"""
-    with open(txt_path, 'rb') as my_file:
-        raw_data = my_file.read()
+def is_utf8(data, is_whole = True):
+    """check whether bytes decode as UTF-8, allowing a character cut off at the end"""
+    try:
+        data.decode('utf-8')
+        return True
+    except UnicodeDecodeError as e:
+        return not is_whole and e.start >= len(data) - 3 and e.reason == 'unexpected end of data'
 
-    # Use chardet to detect the encoding
-    result = chardet.detect(raw_data)
-    encoding = result['encoding']
-
-    # Open the file again with the detected encoding
-    with open(txt_path, 'r', encoding=encoding) as my_file:
-        data = my_file.read()
-        data_into_list = data.split("\n")
+def detect_encoding(txt_path, sample_size = 2**20, min_confidence = 0.9):
+    """detect the encoding of a text file from bounded samples of its bytes
+    
+    A byte order mark or a sample that decodes as UTF-8 settles the encoding
+    at once, and chardet judges other samples. An ASCII sample says nothing
+    about the rest of the file, so the first chunk that is not ASCII is judged
+    instead. If chardet is not confident, an incremental detector reads the 
+    file in chunks until it is sure. If neither reaches min_confidence, the
+    file is read as windows-1252.
+    """
+    with open(txt_path, 'rb') as my_file:
+        sample = my_file.read(sample_size)
+        
+        # byte order marks
+        if sample.startswith(b'\xef\xbb\xbf'):
+            return 'utf-8-sig'
+        if sample.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'utf-16'
+        
+        # skip ahead to the first chunk that is not ascii
+        while sample.isascii():
+            chunk = my_file.read(sample_size)
+            if chunk == b'':
+                return 'ascii'
+            sample = chunk
+        is_whole = my_file.read(1) == b''
+    
+    if is_utf8(sample, is_whole):
+        return 'utf-8'
+    
+    # chardet is only imported for files that are neither ascii nor UTF-8
+    import chardet
+    from chardet import UniversalDetector
     
-    # Remove empty strings
-    data_into_list = [x for x in data_into_list if x != '']
+    # judge the lines with non-ascii bytes
+    lines = b'\n'.join(x for x in sample.split(b'\n') if not x.isascii())
+    result = chardet.detect(lines)
+    if result['encoding'] not in (None, 'ascii') and result['confidence'] >= min_confidence:
+        return result['encoding']
     
-    # Split by tab
-    data_into_list = [x.split('\t') for x in data_into_list]
-    data_into_list = [[elem for elem in inner_list if elem != ''] for inner_list in data_into_list]
+    # feed the whole file incrementally, stopping once the detector is sure
+    detector = UniversalDetector()
+    with open(txt_path, 'rb') as my_file:
+        for chunk in iter(lambda: my_file.read(sample_size), b''):
+            detector.feed(chunk)
+            if detector.done:
+                break
+    detector.close()
+    
+    if detector.result['encoding'] not in (None, 'ascii') and detector.result['confidence'] >= min_confidence:
+        return detector.result['encoding']
+    
+    # windows-1252 decodes most western exports when nothing else is sure
+    return 'cp1252'
+
+def iter_txt_lines(txt_path, encoding = None):
+    """lazily read lines of a text file, split by tab, skipping empty lines and fields"""
+    if encoding is None:
+        encoding = detect_encoding(txt_path)
+    
+    with open(txt_path, 'r', encoding=encoding) as my_file:
+        for line in my_file:
+            # drop the line break
+            if line.endswith('\n'):
+                line = line[:-1]
+            if line == '':
+                continue
+            yield [elem for elem in line.split('\t') if elem != '']
+
+def read_txt_lines(txt_path, encoding = None):
+    """read lines of a text file to a list"""
+    return list(iter_txt_lines(txt_path, encoding = encoding))
+
+import pandas as pd
+from itertools import islice
+def iter_txt_frames(txt_path, chunk_size = 100000, encoding = None, columns = None):
+    """lazily read lines of a text file into data frames of chunk_size rows
     
-    return data_into_list
\ No newline at end of file
+    Rows are tab-split as read_txt_lines splits them, and shorter rows are
+    padded with None, so memory stays proportional to a chunk, not the file.
+    """
+    lines = iter_txt_lines(txt_path, encoding = encoding)
+    for chunk in iter(lambda: list(islice(lines, chunk_size)), []):
+        yield pd.DataFrame(chunk, columns = columns)
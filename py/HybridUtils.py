@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 13 10:02:18 2026
+"""
+
+import pandas as pd
+
+from . import PDFMinerUtils, TesseractUtils
+
+def get_page_coverage(pdf, page_boxes):
+    """Measures the text layer of each page of a pdf.
+
+        Returns a data frame with a row for each page, providing the page
+        number, the number of characters in its text layer, and the fraction
+        of the page area covered by text boxes.
+
+        Parameters
+        ----------
+        pdf : list, required
+            A list of lists with pdf text, as returned by
+            PDFMinerUtils.extract_pdf_text.
+        page_boxes : data frame, required
+            The page boxes of the pdf, as returned by
+            PDFMinerUtils.get_page_boxes.
+        """
+    coverage = []
+    for pg_num, pg in enumerate(pdf, start = 1):
+        text_boxes = [x for x in pg if x.get('text', '') != '']
+        chars = sum(len(x['text']) for x in text_boxes)
+        area = sum((x['coords'][2] - x['coords'][0])*(x['coords'][3] - x['coords'][1]) for x in text_boxes)
+        coverage.append([pg_num, chars, area])
+    coverage = pd.DataFrame(coverage, columns = ['page', 'chars', 'coverage'])
+
+    # relative to the page area
+    page_area = (page_boxes['right'] - page_boxes['left'])*(page_boxes['top'] - page_boxes['bottom'])
+    coverage['coverage'] = coverage['coverage']/page_area.to_numpy()
+
+    return coverage
+
+def route_pages(pdf, page_boxes, min_chars = 50, min_coverage = 0.01):
+    """Decide which pages of a pdf need OCR.
+
+        Returns the data frame of get_page_coverage with an additional boolean
+        column `ocr`, which is True for pages that have no usable text layer:
+        pages with fewer than min_chars characters or whose text boxes cover
+        less than min_coverage of the page.
+
+        Parameters
+        ----------
+        pdf : list, required
+            A list of lists with pdf text, as returned by
+            PDFMinerUtils.extract_pdf_text.
+        page_boxes : data frame, required
+            The page boxes of the pdf, as returned by
+            PDFMinerUtils.get_page_boxes.
+        min_chars : int, optional
+            The minimum number of characters of a usable text layer. Defaults
+            to 50.
+        min_coverage : float, optional
+            The minimum fraction of the page covered by text boxes of a usable
+            text layer. Defaults to 0.01.
+        """
+    coverage = get_page_coverage(pdf, page_boxes)
+    coverage['ocr'] = (coverage['chars'] < min_chars) | (coverage['coverage'] < min_coverage)
+
+    return coverage
+
+def get_ocr_page_data(data, page_box, dpi):
+    """Structures Tesseract words of a page like PDFMiner page data.
+
+        Returns a data frame with the columns page, left, right, bottom and top
+        in pdf points, and text, with a row for each word Tesseract detected.
+        Points are measured from the bottom left corner of the page, as
+        PDFMiner measures them, whatever the origin of the media box. Pages
+        rotated with /Rotate are not handled: the height of the unrotated
+        media box is used, so words on pages rotated by 90 or 270 degrees are
+        misplaced.
+
+        Parameters
+        ----------
+        data : data frame, required
+            The Tesseract data of a page, as returned by
+            TesseractUtils.ocr_pdf_page.
+        page_box : series, required
+            The page box of the page, as a row of PDFMinerUtils.get_page_boxes.
+        dpi : int, required
+            The resolution at which the page was rendered.
+        """
+    words = data[(data['level'] == 5) & data['text'].notna()]
+    words = words[words['text'].str.strip() != '']
+
+    # pixels from the top left to points from the bottom left; PDFMiner
+    # moves the origin of the media box to 0, so the page spans 0 to its height
+    scale = 72/dpi
+    height = page_box['top'] - page_box['bottom']
+    left = words['left'].to_numpy()*scale
+    right = (words['left'] + words['width']).to_numpy()*scale
+    top = height - words['top'].to_numpy()*scale
+    bottom = height - (words['top'] + words['height']).to_numpy()*scale
+
+    page_data = pd.DataFrame({
+        'page': words['page_num'].to_numpy(),
+        'left': left,
+        'right': right,
+        'bottom': bottom,
+        'top': top,
+        'text': words['text'].str.strip().to_numpy()
+    })
+
+    return page_data
+
+def extract_pdf_data(pdf_path, min_chars = 50, min_coverage = 0.01, dpi = 500, workers = 1, cache = None):
+    """Extract pdf data, OCRing only pages without a usable text layer.
+
+        Returns a data frame with the columns page, left, right, bottom, top
+        and text, as PDFMinerUtils.extract_pdf_data does. Pages with a usable
+        text layer come from PDFMiner. The remaining pages, as decided by
+        route_pages, are rendered and OCRed with Tesseract, and contribute a
+        row for each word in pdf points.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        min_chars : int, optional
+            The minimum number of characters of a usable text layer. Defaults
+            to 50.
+        min_coverage : float, optional
+            The minimum fraction of the page covered by text boxes of a usable
+            text layer. Defaults to 0.01.
+        dpi : int, optional
+            The resolution at which pages are rendered for OCR. Defaults to 500.
+        workers : int, optional
+            The number of processes over which pages are OCRed. If None, one
+            process per core is used. Defaults to 1.
+        cache : ResultCache, optional
+            A cache of page layouts for PDFMiner. Defaults to None.
+        """
+    pdf = PDFMinerUtils.extract_pdf_text(pdf_path, cache = cache)
+    page_boxes = PDFMinerUtils.get_page_boxes(pdf_path)
+    routes = route_pages(pdf, page_boxes, min_chars = min_chars, min_coverage = min_coverage)
+    ocr_pages = routes.loc[routes['ocr'], 'page'].tolist()
+
+    # keep the text layer of the other pages
+    data = PDFMinerUtils.extract_pdf_data(pdf)
+    data = data[~data['page'].isin(ocr_pages)]
+
+    if len(ocr_pages) > 0:
+        if workers != 1 and len(ocr_pages) > 1:
+            ocr_data = TesseractUtils.map_pages(
+                [pdf_path] * len(ocr_pages), ocr_pages, dpi = dpi, output = 'data',
+                workers = workers
+            )
+        else:
+            ocr_data = [TesseractUtils.ocr_pdf_page(pdf_path, x, dpi = dpi, output = 'data') for x in ocr_pages]
+        ocr_data = [
+            get_ocr_page_data(x, page_boxes.loc[pg_num - 1], dpi)
+            for pg_num, x in zip(ocr_pages, ocr_data)
+        ]
+        data = pd.concat([data] + ocr_data)
+
+    # sort and reindex
+    data = data.sort_values(by=['page', 'top', 'left'], ascending = [True, False, True])
+    data.index = range(data.shape[0])
+
+    return data
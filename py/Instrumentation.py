@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:37:52 2026
+"""
+
+from contextlib import nullcontext
+from functools import wraps
+
+import os
+import sys
+import json
+import time
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# the sinks receiving stage records; instrumentation is off while empty
+sinks = []
+
+# returned by stage while instrumentation is off, so disabled stages cost
+# one call and a check
+NULL_STAGE = nullcontext()
+
+def get_peak_rss():
+    """Get the peak resident set size of this process in bytes, or None."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    except (ImportError, AttributeError):
+        return None
+
+class Stage:
+    """Measures one stage of the pipeline and emits a record to the sinks.
+
+        The record is a dictionary yielded by the with statement, so a stage
+        can add what it only knows at the end, e.g. record['bytes']. On exit
+        it holds the stage name, the page number, the wall and CPU seconds,
+        the bytes and pages processed, the process_peak_rss, the process id
+        and the start time. The process_peak_rss is the peak resident set size
+        of the process so far, not of the stage, so every stage after the one
+        using the most memory reports the same value.
+        """
+    def __init__(self, name, page = None, **fields):
+        self.record = {'stage': name, 'page': page, 'bytes': None, 'pages': None}
+        self.record.update(fields)
+
+    def __enter__(self):
+        self.record['start'] = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self.record
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record['wall_seconds'] = time.perf_counter() - self.wall
+        self.record['cpu_seconds'] = time.process_time() - self.cpu
+        self.record['process_peak_rss'] = get_peak_rss()
+        self.record['pid'] = os.getpid()
+        self.record['error'] = None if exc_type is None else exc_type.__name__
+        for sink in sinks:
+            sink(self.record)
+
+        return False
+
+def stage(name, page = None, **fields):
+    """Instrument a stage of the pipeline.
+
+        Returns a context manager. While instrumentation is enabled, it times
+        the body of the with statement and emits a record to every sink, as
+        described in Stage. While it is disabled, it does nothing and yields
+        None, so callers only compute extra fields when the record is not None.
+
+        Parameters
+        ----------
+        name : str, required
+            The name of the stage, e.g. 'render' or 'tesseract'.
+        page : int, optional
+            The page number the stage works on. Defaults to None.
+        fields : keyword arguments, optional
+            Additional fields of the record.
+        """
+    if not sinks:
+        return NULL_STAGE
+
+    return Stage(name, page, **fields)
+
+def instrumented(name):
+    """Instrument every call of a function as a stage.
+
+        Returns a decorator. While instrumentation is disabled, the decorated
+        function costs one extra call and a check.
+
+        Parameters
+        ----------
+        name : str, required
+            The name of the stage.
+        """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not sinks:
+                return func(*args, **kwargs)
+            with Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+def enabled():
+    """Whether instrumentation is enabled."""
+    return len(sinks) > 0
+
+def enable(*new_sinks):
+    """Enable instrumentation, adding sinks.
+
+        Records are emitted in this process only; stages running in worker
+        processes, e.g. with workers != 1, are not recorded.
+
+        Parameters
+        ----------
+        new_sinks : callables, required
+            Callables taking a record dictionary, e.g. a function, a
+            JSONLinesSink or a SummarySink.
+        """
+    sinks.extend(new_sinks)
+
+def disable():
+    """Disable instrumentation, removing all sinks."""
+    sinks.clear()
+
+class instrument:
+    """Enable instrumentation with sinks for the body of a with statement.
+
+        Parameters
+        ----------
+        new_sinks : callables, required
+            Callables taking a record dictionary.
+        """
+    def __init__(self, *new_sinks):
+        self.new_sinks = new_sinks
+
+    def __enter__(self):
+        enable(*self.new_sinks)
+        return self.new_sinks[0] if len(self.new_sinks) == 1 else self.new_sinks
+
+    def __exit__(self, *args):
+        for sink in self.new_sinks:
+            sinks.remove(sink)
+        return False
+
+class JSONLinesSink:
+    """Appends each record as a line of JSON to a file.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the log file.
+        """
+    def __init__(self, path):
+        self.path = path
+        self.fp = open(path, 'a', encoding = 'utf-8')
+
+    def __call__(self, record):
+        self.fp.write(json.dumps(record, default = str) + '\n')
+        self.fp.flush()
+
+    def close(self):
+        """Close the log file."""
+        self.fp.close()
+
+class SummarySink:
+    """Collects records in memory and summarizes them by stage."""
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(dict(record))
+
+    def frame(self):
+        """Get the collected records as a data frame, one row per record."""
+        return pd.DataFrame(self.records)
+
+    def table(self):
+        """Summarize the collected records.
+
+            Returns a data frame with a row for each stage, giving the number
+            of records, the total and mean wall seconds, the total CPU
+            seconds, the total bytes and pages, the process_peak_rss by the end
+            of the stage, as described in Stage, and the share of the total
+            wall time, slowest stage first.
+            """
+        cols = [
+            'stage', 'calls', 'wall_seconds', 'mean_wall_seconds', 'cpu_seconds', 'bytes',
+            'pages', 'process_peak_rss', 'share'
+        ]
+        if len(self.records) == 0:
+            return pd.DataFrame(columns = cols)
+
+        records = self.frame()
+        table = records.groupby('stage').agg(
+            calls = ('wall_seconds', 'size'),
+            wall_seconds = ('wall_seconds', 'sum'),
+            mean_wall_seconds = ('wall_seconds', 'mean'),
+            cpu_seconds = ('cpu_seconds', 'sum'),
+            bytes = ('bytes', 'sum'),
+            pages = ('pages', 'sum'),
+            process_peak_rss = ('process_peak_rss', 'max')
+        )
+        table['share'] = table['wall_seconds']/table['wall_seconds'].sum()
+        table = table.sort_values('wall_seconds', ascending = False).reset_index()
+
+        return table[cols]
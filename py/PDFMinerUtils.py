@@ -18,6 +18,19 @@ import numpy as np
 import pandas as pd
 import ctypes
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from . import Instrumentation
+
+# share one text buffer per column if pyarrow is available
+try:
+    import pyarrow
+    text_dtype = pd.StringDtype("pyarrow")
+except ImportError:
+    text_dtype = object
+
 def parse_layout(layout):
     """Recursively parse layout tree."""
     layout_list = list()
@@ -27,13 +40,130 @@ def parse_layout(layout):
         plt_dict["coords"] = lt_obj.bbox
         if isinstance(lt_obj, LTTextBox) or isinstance(lt_obj, LTTextLine):
             plt_dict["text"] = lt_obj.get_text().strip()
-        elif isinstance(lt_obj, LTFigure):
-            parse_layout(lt_obj)  # Recursive
         layout_list.append(plt_dict)
+        if isinstance(lt_obj, LTFigure):
+            layout_list.extend(parse_layout(lt_obj))  # Recursive
     
     return layout_list
 
-def extract_pdf_text(pdf_path):
+def parse_layout_columns(layout, page_num, columns):
+    """Recursively parse layout tree into columns.
+
+        Appends the page number, object type, coordinates, and text (or an 
+        empty string) of each object of the layout tree to the lists of the 
+        columns dictionary, in the order parse_layout lists them.
+
+        Parameters
+        ----------
+        layout : layout object, required
+            A pdfminer layout tree, e.g. a page or a figure.
+        page_num : int, required
+            The page number of the layout tree.
+        columns : dict, required
+            A dictionary of lists keyed by page, class, left, right, bottom, 
+            top and text.
+        """
+    for lt_obj in layout:
+        x0, y0, x1, y1 = lt_obj.bbox
+        columns['page'].append(page_num)
+        columns['class'].append(lt_obj.__class__.__name__)
+        columns['left'].append(x0)
+        columns['right'].append(x1)
+        columns['bottom'].append(y0)
+        columns['top'].append(y1)
+        if isinstance(lt_obj, LTTextBox) or isinstance(lt_obj, LTTextLine):
+            columns['text'].append(lt_obj.get_text().strip())
+        else:
+            columns['text'].append('')
+        if isinstance(lt_obj, LTFigure):
+            parse_layout_columns(lt_obj, page_num, columns)  # Recursive
+    
+    return columns
+
+def iter_pdf_text(pdf_path, first_page = 1, last_page = None, cache = None):
+    """Lazily convert layout tree to pdf pages.
+
+        Yields the parsed objects of each page of the pdf, as listed by 
+        extract_pdf_text, one page at a time. The pdf is closed once the last
+        page is yielded or the generator is closed.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        first_page : int, optional
+            The page number of the first page to yield. Defaults to 1.
+        last_page : int, optional
+            The page number of the last page to yield. Defaults to None, 
+            yielding all pages to the end of the pdf.
+        cache : ResultCache, optional
+            A cache of page layouts, keyed by the content hash of the pdf, the 
+            page number and the LAParams. Only pages missing from the cache are
+            analyzed. Defaults to None.
+        """
+    with open(pdf_path, 'rb') as fp:
+        parser = PDFParser(fp)
+        doc = PDFDocument(parser)
+    
+        rsrcmgr = PDFResourceManager()
+        laparams = LAParams()
+        device = PDFPageAggregator(rsrcmgr, laparams=laparams)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page_num, page in enumerate(PDFPage.create_pages(doc), start = 1):
+            if page_num < first_page:
+                continue
+            if last_page is not None and page_num > last_page:
+                break
+            
+            if cache is not None:
+                key = cache.make_key(pdf_path, 'pdfminer_layout', page_num, laparams = vars(laparams))
+                layout = cache.get(key)
+                if layout is not None:
+                    yield layout
+                    continue
+            
+            with Instrumentation.stage('pdfminer_layout', page = page_num, pages = 1):
+                interpreter.process_page(page)
+                layout = device.get_result()
+            with Instrumentation.stage('parse_layout', page = page_num):
+                layout = parse_layout(layout)
+                layout = np.array(layout)
+            
+            if cache is not None:
+                cache.put(key, layout)
+            
+            yield layout
+
+def extract_pdf_pages(pdf_path, first_page, last_page, cache = None):
+    """Convert a range of pdf pages to a list, as extract_pdf_text does.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        first_page : int, required
+            The page number of the first page of the range.
+        last_page : int, required
+            The page number of the last page of the range.
+        cache : ResultCache, optional
+            A cache of page layouts. Defaults to None.
+        """
+    return list(iter_pdf_text(pdf_path, first_page, last_page, cache = cache))
+
+def get_page_count(pdf_path):
+    """Count the pages of a pdf.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        """
+    with open(pdf_path, 'rb') as fp:
+        n_pages = sum(1 for _ in PDFPage.get_pages(fp))
+    
+    return n_pages
+
+def extract_pdf_text(pdf_path, cache = None, workers = 1):
     """Convert layout tree to list of pdf pages.
 
         Returns a list of lists. The outer list enumerates the pages of the pdf.
@@ -45,24 +175,145 @@ def extract_pdf_text(pdf_path):
         ----------
         pdf_path : str, required
             The absolute path of a pdf document.
+        cache : ResultCache, optional
+            A cache of page layouts, keyed by the content hash of the pdf, the 
+            page number and the LAParams. Only pages missing from the cache are
+            analyzed. Defaults to None.
+        workers : int, optional
+            The number of processes over which pages are analyzed. Each process
+            opens its own parser on a contiguous range of pages, and the ranges
+            are combined in page order. If None, one process per core is used.
+            Defaults to 1, analyzing pages one after another in this process.
         """
-    fp = open(pdf_path, 'rb')
-    parser = PDFParser(fp)
-    doc = PDFDocument(parser)
+    if workers == 1:
+        return list(iter_pdf_text(pdf_path, cache = cache))
+    
+    # shard the pages into a few contiguous ranges per worker
+    n_pages = get_page_count(pdf_path)
+    n_shards = min(n_pages, 2 * (workers or os.cpu_count()))
+    bounds = np.linspace(0, n_pages, num = n_shards + 1).round().astype(int)
+    first_pages = bounds[:-1] + 1
+    last_pages = bounds[1:]
+    
+    # results come back in page order
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        shards = executor.map(
+            extract_pdf_pages, repeat(pdf_path), first_pages.tolist(), 
+            last_pages.tolist(), repeat(cache)
+        )
+        layouts = [layout for shard in shards for layout in shard]
+    
+    return layouts
 
-    rsrcmgr = PDFResourceManager()
+def extract_pdf_layout(pdf_path, cache = None):
+    """Convert layout tree to a columnar data frame.
+
+        Returns a data frame with a row for each object of the pdf, in the 
+        order extract_pdf_text lists them, and the columns page, class, left,
+        right, bottom, top and text. Objects are written straight into columns
+        rather than dictionaries: coordinates are float32, class is 
+        categorical, page is a small integer, and text shares a single Arrow 
+        buffer when pyarrow is installed. The result can be passed in place of
+        the list of extract_pdf_text to get_page_coordinates and 
+        extract_pdf_data.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        cache : ResultCache, optional
+            A cache of layouts, keyed by the content hash of the pdf and the 
+            LAParams. Defaults to None.
+        """
     laparams = LAParams()
-    device = PDFPageAggregator(rsrcmgr, laparams=laparams)
-    interpreter = PDFPageInterpreter(rsrcmgr, device)
-    layouts = list()
-    for page in PDFPage.create_pages(doc):
-        interpreter.process_page(page)
-        layout = device.get_result()
-        layout = parse_layout(layout)
-        layout = np.array(layout)
-        layouts.append(layout)
+    if cache is not None:
+        key = cache.make_key(pdf_path, 'pdfminer_columns', laparams = vars(laparams))
+        layout = cache.get(key)
+        if layout is not None:
+            return layout
     
-    return layouts
+    cols = ['page', 'class', 'left', 'right', 'bottom', 'top', 'text']
+    columns = {x: [] for x in cols}
+    with open(pdf_path, 'rb') as fp:
+        parser = PDFParser(fp)
+        doc = PDFDocument(parser)
+    
+        rsrcmgr = PDFResourceManager()
+        device = PDFPageAggregator(rsrcmgr, laparams=laparams)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page_num, page in enumerate(PDFPage.create_pages(doc), start = 1):
+            with Instrumentation.stage('pdfminer_layout', page = page_num, pages = 1):
+                interpreter.process_page(page)
+                layout = device.get_result()
+            with Instrumentation.stage('parse_layout', page = page_num):
+                parse_layout_columns(layout, page_num, columns)
+    
+    # compact column types
+    layout = pd.DataFrame({
+        'page': np.array(columns['page'], dtype = np.int32),
+        'class': pd.Categorical(columns['class']),
+        'left': np.array(columns['left'], dtype = np.float32),
+        'right': np.array(columns['right'], dtype = np.float32),
+        'bottom': np.array(columns['bottom'], dtype = np.float32),
+        'top': np.array(columns['top'], dtype = np.float32),
+        'text': pd.array(columns['text'], dtype = text_dtype)
+    })
+    
+    if cache is not None:
+        cache.put(key, layout)
+    
+    return layout
+
+def parse_layout_lines(layout, page_num, columns):
+    """Recursively parse the text lines of a layout tree into columns.
+
+        As parse_layout_columns, but appends each line of text, of text boxes
+        and figures alike, rather than each top level object.
+        """
+    for lt_obj in layout:
+        if isinstance(lt_obj, LTTextLine):
+            text = lt_obj.get_text().strip()
+            if text != '':
+                x0, y0, x1, y1 = lt_obj.bbox
+                columns['page'].append(page_num)
+                columns['left'].append(x0)
+                columns['right'].append(x1)
+                columns['bottom'].append(y0)
+                columns['top'].append(y1)
+                columns['text'].append(text)
+        elif isinstance(lt_obj, (LTTextBox, LTFigure)):
+            parse_layout_lines(lt_obj, page_num, columns)  # Recursive
+
+    return columns
+
+def extract_pdf_lines(pdf_path):
+    """Extract the text lines of a pdf.
+
+        Returns a data frame with the columns of extract_pdf_data, but with a
+        row for each line of text rather than each text box, so the boxes
+        locate text to a line, e.g. for SearchIndex.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        """
+    cols = ['page', 'left', 'right', 'bottom', 'top', 'text']
+    columns = {x: [] for x in cols}
+    with open(pdf_path, 'rb') as fp:
+        parser = PDFParser(fp)
+        doc = PDFDocument(parser)
+
+        rsrcmgr = PDFResourceManager()
+        device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page_num, page in enumerate(PDFPage.create_pages(doc), start = 1):
+            with Instrumentation.stage('pdfminer_layout', page = page_num, pages = 1):
+                interpreter.process_page(page)
+                layout = device.get_result()
+            parse_layout_lines(layout, page_num, columns)
+
+    return pd.DataFrame(columns, columns = cols)
 
 def get_page_coordinates(pdf):
     """Provides the coordinates of each page of a pdf.
@@ -72,9 +323,24 @@ def get_page_coordinates(pdf):
 
         Parameters
         ----------
-        pdf : list, required
-            A list of lists with pdf text.
+        pdf : list or data frame, required
+            A list of lists with pdf text, or a data frame as returned by 
+            extract_pdf_layout.
         """
+    cols = ['left', 'right', 'bottom', 'top']
+    if isinstance(pdf, pd.DataFrame):
+        # the topmost object on the left edge of each page
+        edges = pdf[(pdf['left'] == 0) & (pdf['right'] == 0)]
+        pages = edges.groupby('page')
+        edges = edges[
+            (edges['bottom'] == pages['bottom'].transform('max')) & 
+            (edges['top'] == pages['top'].transform('max'))
+        ]
+        coords = edges.groupby('page').head(1)[cols]
+        coords.index = range(coords.shape[0])
+        
+        return coords
+    
     new_pdf = [[tb for tb in pg if tb['coords'][0] == 0 and tb['coords'][2] == 0] for pg in pdf]
     
     # find page coordinates
@@ -98,6 +364,29 @@ def get_page_coordinates(pdf):
     
     return coords
     
+def get_page_boxes(pdf_path):
+    """Provides the media box of each page of a pdf.
+
+        Returns a data frame of page boxes. Each row represents a page, and
+        each column represents the boundary of the page in pdf points, as 
+        rendered by poppler.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        """
+    with open(pdf_path, 'rb') as fp:
+        boxes = np.array([page.mediabox for page in PDFPage.get_pages(fp)], dtype = float)
+    boxes = boxes.reshape(-1, 4)
+    
+    # organize left, right, bottom, top
+    cols = ['left', 'right', 'bottom', 'top']
+    boxes = np.column_stack((boxes[:, 0], boxes[:, 2], boxes[:, 1], boxes[:, 3]))
+    boxes = pd.DataFrame(boxes, columns = cols)
+    
+    return boxes
+    
 def get_page_data(page):
     """Structures a page's objects into a data frame.
 
@@ -123,6 +412,7 @@ def get_page_data(page):
     return coords
 
 # extract all data from pdf
+@Instrumentation.instrumented('extract_pdf_data')
 def extract_pdf_data(pdf):
     """Recursively structure the objects of a pdf.
 
@@ -131,9 +421,17 @@ def extract_pdf_data(pdf):
 
             Parameters
             ----------
-            df : list, required
-                A list of of list of dictionaries, representing the objects of a pdf page.
+            df : list or data frame, required
+                A list of of list of dictionaries, representing the objects of a pdf page,
+                or a data frame as returned by extract_pdf_layout. The columns of
+                a data frame are selected without converting any objects.
             """
+    if isinstance(pdf, pd.DataFrame):
+        data = pdf[['page', 'left', 'right', 'bottom', 'top', 'text']]
+        data.index = range(data.shape[0])
+        
+        return data
+    
     # extract page data for each page
     page_data = []
     for pg_num, pg in enumerate(pdf, start=1):
@@ -227,40 +525,88 @@ def disperse_row(pdf_data, row, seperator, direction, sort = False):
     
     return new_pdf_data
         
+@Instrumentation.instrumented('disperse')
 def disperse(pdf_data, seperator, direction):
-    """Recursively splits pdf text along a specified seperator.
+    """Splits pdf text along a specified seperator.
 
             Returns a data frame with at least as many rows as input. The text 
-            data is recursively split at the specified seperator until the specified
-            seperator is no longer present in the pdf data. Coordinates are 
-            adjusted accordingly according to the width of text split and direction 
-            of dispersion.
+            data of every row is split at the specified seperator in a single
+            pass, so the specified seperator is no longer present in the pdf 
+            data. Coordinates are adjusted accordingly according to the width 
+            of text split and direction of dispersion, matching the results of
+            calling disperse_row on each row.
 
             Parameters
             ----------
             pdf_data : data frame, required
                 A data frame representing the extracted data of a pdf.
             seperator : str, required
-                A string on which text data is recursively split and dispersed.
+                A string on which text data is split and dispersed.
             direction : str, required
                 A string 'vertical' or 'horizontal' representing the direction 
                 with which the text is dispersed. If vertical, the bottom and top
-                coordinates are recursively adjusted proportional to the number 
-                of splits. If horizontal, the left and right coordinates are 
-                recursively  adjusted proportional to the relative character 
-                width of the splitted text.
+                coordinates are adjusted proportional to the number of splits. 
+                If horizontal, the left and right coordinates are adjusted 
+                proportional to the relative character width of the splitted text.
             """
-    n = pdf_data.shape[0]
-    sep_in = np.array([seperator in x for x in pdf_data['text']])
-    ctr = 0
-    
-    # recurse
-    while np.any(sep_in) and ctr <= n:
-        row = np.where(sep_in)[0][0]
-        row_idx = pdf_data.index[row]
-        pdf_data = disperse_row(pdf_data, row = row_idx, seperator = seperator, direction = direction, sort = False)
-        sep_in = np.array([seperator in x for x in pdf_data['text']])
-        ctr = ctr + 1
+    if direction not in ('vertical', 'horizontal'):
+        raise ValueError("direction must be either vertical or horizontal")
+    
+    # split all rows at once
+    splits = pdf_data['text'].str.split(seperator, regex = False)
+    counts = splits.str.len().to_numpy()
+    is_split = counts > 1
+    
+    if np.any(is_split):
+        split_rows = pdf_data.loc[is_split]
+        counts = counts[is_split]
+        
+        # map each new row to its source row and position within it
+        src = np.repeat(np.arange(split_rows.shape[0]), counts)
+        pos = np.arange(src.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        new_n = counts[src]
+        new_text = splits.loc[is_split].explode().to_numpy()
+        
+        left = split_rows['left'].to_numpy(dtype = float)[src]
+        right = split_rows['right'].to_numpy(dtype = float)[src]
+        bottom = split_rows['bottom'].to_numpy(dtype = float)[src]
+        top = split_rows['top'].to_numpy(dtype = float)[src]
+        
+        # get new boundaries based on direction
+        if direction == 'horizontal':
+            # character weights, accumulated within each source row
+            weights = np.array([len(x) for x in new_text])
+            totals = np.bincount(src, weights = weights)[src]
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                widths = weights/totals*(right - left)
+            bounds = np.empty_like(widths)
+            for k in np.unique(counts):
+                # rows with k splits are accumulated together as a k-column array
+                in_k = new_n == k
+                bounds[in_k] = np.cumsum(widths[in_k].reshape(-1, k), axis = 1).ravel()
+            new_right = left + bounds
+            new_left = np.where(pos == 0, left, np.roll(new_right, 1))
+            right = new_right
+            left = new_left
+        else:
+            # equally spaced bounds, as with np.linspace
+            step = (top - bottom)/new_n
+            new_bottom = pos*step + bottom
+            new_top = np.where(pos + 1 == new_n, top, (pos + 1)*step + bottom)
+            bottom = new_bottom
+            top = new_top
+        
+        new_rows = pd.DataFrame({
+            'page': split_rows['page'].to_numpy()[src],
+            'left': left,
+            'right': right,
+            'bottom': bottom,
+            'top': top,
+            'text': new_text
+        })
+        
+        # replace
+        pdf_data = pd.concat([pdf_data.loc[~is_split], new_rows])
         
     # sort and reindex
     pdf_data = pdf_data.sort_values(by=['page', 'top', 'left'], ascending = [True, False, True])
@@ -332,4 +678,161 @@ def coalesce_rows(pdf_data, rows, direction, sort = True):
     # reindex
     new_pdf_data.index = range(new_pdf_data.shape[0])
     
-    return new_pdf_data
\ No newline at end of file
+    return new_pdf_data
+
+@Instrumentation.instrumented('coalesce_groups')
+def coalesce_groups(pdf_data, groups, direction, sort = True):
+    """Coalesce several groups of pdf data rows in a single pass.
+
+            Returns a data frame with no more than the number of rows as input.
+            The rows of each group are combined into a new row, exactly as 
+            coalesce_rows combines the rows it is given, but all groups are 
+            merged in one grouped aggregation rather than one call per group.
+            Rows with a missing group key, and groups of one row, are kept as
+            they are.
+
+            Parameters
+            ----------
+            pdf_data : data frame, required
+                A data frame representing the extracted data of a pdf.
+            groups : str or array-like, required
+                The name of a column of pdf_data, or group keys aligned with the 
+                rows of pdf_data, e.g. as returned by cluster_lines. Text is 
+                combined in the order of the rows within each group.
+            direction : str, required
+                A string 'vertical' or 'horizontal' representing the direction 
+                with which the text is coalesced. If vertical, text is combined
+                with a new line character. If horizontal, text is combined with
+                a space.
+            sort : bool, required
+                A boolean whether or not to sort the new resulting data frame.
+                Defaults to True.
+            """
+    # set seperator
+    if direction == 'vertical':
+        seperator = '\n'
+    elif direction == 'horizontal':
+        seperator = ' '
+    else:
+        raise ValueError("direction must be either vertical or horizontal")
+    
+    # group keys aligned by position
+    if isinstance(groups, str):
+        groups = pdf_data[groups]
+    groups = pd.Series(np.asarray(groups), index = pdf_data.index)
+    sizes = pdf_data.groupby(groups, sort = False)['page'].transform('size')
+    to_merge = (sizes > 1).to_numpy()
+    
+    if not np.any(to_merge):
+        new_pdf_data = pdf_data
+    else:
+        pdf_rows = pdf_data.loc[to_merge]
+        grouped = pdf_rows.groupby(groups.loc[to_merge], sort = False)
+        if np.any(grouped['page'].nunique() > 1):
+            raise ValueError("data to coalesce must be on one page.")
+        
+        # get new boundaries and text of every group
+        new_rows = grouped.agg(
+            page = ('page', 'first'),
+            left = ('left', 'min'),
+            right = ('right', 'max'),
+            bottom = ('bottom', 'min'),
+            top = ('top', 'max'),
+            text = ('text', lambda x: x.str.cat(sep = seperator))
+        )
+        new_rows = new_rows[['page', 'left', 'right', 'bottom', 'top', 'text']]
+        
+        # replace
+        new_pdf_data = pd.concat([pdf_data.loc[~to_merge], new_rows])
+    
+    # sort if needed
+    if sort:
+        new_pdf_data = new_pdf_data.sort_values(by=['page', 'top', 'left'], ascending = [True, False, True])
+    
+    # reindex
+    new_pdf_data.index = range(new_pdf_data.shape[0])
+    
+    return new_pdf_data
+
+def cluster_lines(pdf_data, overlap = 0.5, max_gap = None):
+    """Cluster pdf data rows into lines.
+
+            Returns a series of integer line keys aligned with pdf_data, for use
+            with coalesce_groups. Rows of a page are ordered from top to bottom,
+            and a new line starts wherever a row overlaps the vertical extent of
+            the previous row by less than the fraction overlap of the smaller of 
+            the two heights. If max_gap is given, lines are further split 
+            wherever the horizontal gap between neighbouring rows exceeds it.
+
+            Parameters
+            ----------
+            pdf_data : data frame, required
+                A data frame representing the extracted data of a pdf.
+            overlap : float, optional
+                The minimum fraction of vertical overlap of rows on one line.
+                Defaults to 0.5.
+            max_gap : float, optional
+                The largest horizontal gap between neighbouring rows of a line.
+                Defaults to None, not splitting lines.
+            """
+    page = pdf_data['page'].to_numpy()
+    left = pdf_data['left'].to_numpy(dtype = float)
+    right = pdf_data['right'].to_numpy(dtype = float)
+    bottom = pdf_data['bottom'].to_numpy(dtype = float)
+    top = pdf_data['top'].to_numpy(dtype = float)
+    
+    # order by page, then top to bottom by vertical center
+    order = np.lexsort((left, -(bottom + top), page))
+    page, left, right, bottom, top = page[order], left[order], right[order], bottom[order], top[order]
+    
+    # overlap of each row with the previous row
+    shared = np.minimum(top[1:], top[:-1]) - np.maximum(bottom[1:], bottom[:-1])
+    height = np.minimum(top[1:] - bottom[1:], top[:-1] - bottom[:-1])
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        shared = np.where(height > 0, shared/height, (shared >= 0).astype(float))
+    breaks = (page[1:] != page[:-1]) | (shared < overlap)
+    lines = np.concatenate([[0], np.cumsum(breaks)])
+    
+    # split lines at wide horizontal gaps
+    if max_gap is not None:
+        order_x = np.lexsort((left, lines))
+        gaps = left[order_x][1:] - right[order_x][:-1]
+        same = lines[order_x][1:] == lines[order_x][:-1]
+        breaks_x = ~same | (gaps > max_gap)
+        lines_x = np.empty_like(lines)
+        lines_x[order_x] = np.concatenate([[0], np.cumsum(breaks_x)])
+        lines = lines_x
+    
+    # back to the order of pdf_data
+    keys = np.empty_like(lines)
+    keys[order] = lines
+    
+    return pd.Series(keys, index = pdf_data.index)
+
+def coalesce_lines(pdf_data, overlap = 0.5, max_gap = None, sort = True):
+    """Coalesce pdf data into lines of text.
+
+            Returns a data frame with a row for each line found by 
+            cluster_lines, with the text of each line combined from left to 
+            right with spaces.
+
+            Parameters
+            ----------
+            pdf_data : data frame, required
+                A data frame representing the extracted data of a pdf.
+            overlap : float, optional
+                The minimum fraction of vertical overlap of rows on one line.
+                Defaults to 0.5.
+            max_gap : float, optional
+                The largest horizontal gap between neighbouring rows of a line.
+                Defaults to None, not splitting lines.
+            sort : bool, required
+                A boolean whether or not to sort the new resulting data frame.
+                Defaults to True.
+            """
+    lines = cluster_lines(pdf_data, overlap = overlap, max_gap = max_gap)
+    
+    # order rows left to right within each line
+    order = np.lexsort((pdf_data['left'].to_numpy(dtype = float), lines.to_numpy()))
+    
+    return coalesce_groups(pdf_data.iloc[order], lines.iloc[order], 'horizontal', sort = sort)
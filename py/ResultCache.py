@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 12 09:14:36 2026
+"""
+
+from pathlib import Path
+from contextlib import contextmanager
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import zlib
+
+# memoized file hashes, keyed by path, size and modification time
+file_hashes = dict()
+
+def hash_file(file_path, chunk_size = 2**20):
+    """Hash the content of a file.
+
+        Returns the hex digest of the SHA-256 hash of the file content. The
+        file is read in chunks, and the hash is memoized until the size or
+        modification time of the file changes.
+
+        Parameters
+        ----------
+        file_path : str, required
+            The absolute path of a file.
+        chunk_size : int, optional
+            The number of bytes read at a time. Defaults to 1 MiB.
+        """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+    memo_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in file_hashes:
+        return file_hashes[memo_key]
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b''):
+            digest.update(chunk)
+    file_hashes[memo_key] = digest.hexdigest()
+
+    return file_hashes[memo_key]
+
+def make_key(file_path, kind, page_num = None, **settings):
+    """Build a content-addressed cache key.
+
+        Returns a hex digest identifying a result by the content hash of the
+        file it came from, the kind of result, the page number, and the
+        settings it was produced with. Renaming or moving a file keeps its
+        keys; changing its content or any setting does not.
+
+        Parameters
+        ----------
+        file_path : str, required
+            The absolute path of the file the result came from.
+        kind : str, required
+            A name for the kind of result, e.g. 'tesseract_data'.
+        page_num : int, optional
+            The page number of the result. Defaults to None for results
+            covering a whole file.
+        settings : keyword arguments, optional
+            JSON-serializable settings the result depends on, such as the dpi
+            or the LAParams of PDFMiner.
+        """
+    key = [hash_file(file_path), kind, page_num, settings]
+    key = json.dumps(key, sort_keys = True, default = str)
+
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """A persistent on-disk cache of extraction results.
+
+        Values are pickled and zlib-compressed into one file per key, and an
+        SQLite index tracks their sizes and last access times. When the total
+        size exceeds max_bytes, the least recently used values are evicted.
+        Hits and misses are counted for the life of the object.
+
+        Parameters
+        ----------
+        directory : str, required
+            The folder holding the cache. Created if needed.
+        max_bytes : int, optional
+            The maximum total size of the cached values. Defaults to 2 GiB.
+        compression : int, optional
+            The zlib compression level of the cached values. Defaults to 6.
+        """
+    def __init__(self, directory, max_bytes = 2 * 2**30, compression = 6):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents = True, exist_ok = True)
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self.connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, size INTEGER, accessed REAL)"
+            )
+
+    @contextmanager
+    def connect(self):
+        """Open a connection to the index of the cache for one transaction.
+
+            The transaction is committed, or rolled back on an error, and the
+            connection is closed on leaving the with block, so no connections
+            are left open between calls.
+            """
+        con = sqlite3.connect(self.directory / 'index.sqlite', timeout = 60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def make_key(self, file_path, kind, page_num = None, **settings):
+        """Build a content-addressed cache key, as make_key does."""
+        return make_key(file_path, kind, page_num, **settings)
+
+    def value_path(self, key):
+        """Get the path of the file holding the value of a key."""
+        return self.directory / key[:2] / key
+
+    def get(self, key):
+        """Get a cached value.
+
+            Returns the value stored under the key, or None if there is none.
+
+            Parameters
+            ----------
+            key : str, required
+                A key, as returned by make_key.
+            """
+        try:
+            with open(self.value_path(key), 'rb') as fp:
+                value = pickle.loads(zlib.decompress(fp.read()))
+        except FileNotFoundError:
+            self.misses = self.misses + 1
+            return None
+
+        with self.connect() as con:
+            con.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.hits = self.hits + 1
+
+        return value
+
+    def put(self, key, value):
+        """Store a value in the cache, evicting old values if needed.
+
+            Parameters
+            ----------
+            key : str, required
+                A key, as returned by make_key.
+            value : object, required
+                A picklable value, e.g. a string or a data frame.
+            """
+        data = zlib.compress(pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL), self.compression)
+
+        # write atomically so concurrent readers never see partial values
+        value_path = self.value_path(key)
+        value_path.parent.mkdir(exist_ok = True)
+        temp_path = value_path.with_name(f"{key}.{os.getpid()}.tmp")
+        with open(temp_path, 'wb') as fp:
+            fp.write(data)
+        os.replace(temp_path, value_path)
+
+        with self.connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, len(data), time.time())
+            )
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used values until the cache fits max_bytes."""
+        with self.connect() as con:
+            total = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = con.execute("SELECT key, size FROM entries ORDER BY accessed")
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append(key)
+                total = total - size
+
+            con.executemany("DELETE FROM entries WHERE key = ?", [(x,) for x in evicted])
+
+        for key in evicted:
+            self.value_path(key).unlink(missing_ok = True)
+        self.evictions = self.evictions + len(evicted)
+
+    def clear(self):
+        """Remove all values from the cache."""
+        with self.connect() as con:
+            keys = [x[0] for x in con.execute("SELECT key FROM entries")]
+            con.execute("DELETE FROM entries")
+
+        for key in keys:
+            self.value_path(key).unlink(missing_ok = True)
+
+    def stats(self):
+        """Summarize the use of the cache.
+
+            Returns a dictionary with the hits, misses, hit rate and evictions
+            of this object, and the number of entries and total bytes on disk.
+            """
+        with self.connect() as con:
+            entries, size = con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits/lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size
+        }
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:51:33 2026
+"""
+
+from pathlib import Path
+
+import sqlite3
+import hashlib
+import pandas as pd
+
+from . import ResultCache
+
+REGION_COLUMNS = ['page', 'left', 'right', 'bottom', 'top', 'text']
+
+def get_regions(data, lines = True, page_boxes = None, dpi = 500):
+    """Get the searchable regions of extracted pdf data.
+
+        Returns a data frame with the columns page, left, right, bottom, top
+        and text, without empty text, with boxes in pdf points from the bottom
+        left of the page whatever the data. Tesseract data, with the columns
+        of TesseractUtils.extract_pdf_data, is coalesced into lines of words,
+        whose boxes are converted from pixels from the top left to points, as
+        HybridUtils.get_ocr_page_data does. Data with the columns of
+        PDFMinerUtils.extract_pdf_data keeps its rows and boxes, so regions
+        are only as fine as its rows: a text box of
+        PDFMinerUtils.extract_pdf_data may span most of a page, while
+        PDFMinerUtils.extract_pdf_lines has a row for each line.
+
+        Parameters
+        ----------
+        data : data frame, required
+            The Tesseract or PDFMiner data of a pdf.
+        lines : bool, optional
+            A boolean whether rows of PDFMiner data holding a single word, e.g.
+            the OCRed pages of HybridUtils.extract_pdf_data, are coalesced into
+            lines with PDFMinerUtils.coalesce_lines, so phrases match across
+            words. Defaults to True.
+        page_boxes : data frame, optional
+            The page boxes of the pdf, as returned by
+            PDFMinerUtils.get_page_boxes. Required for Tesseract data.
+            Defaults to None.
+        dpi : int, optional
+            The resolution at which Tesseract data was rendered, unless it has
+            a dpi column, as TesseractUtils.ocr_pdf_page_adaptive adds.
+            Defaults to 500, as TesseractUtils.extract_pdf_data renders.
+        """
+    if 'word_num' in data:
+        if page_boxes is None:
+            raise ValueError("page_boxes are required to convert Tesseract boxes to pdf points")
+        words = data[(data['level'] == 5) & data['text'].notna()]
+        words = words[words['text'].str.strip() != '']
+
+        # pixels from the top left to points from the bottom left, with the
+        # origin of the media box at 0 as PDFMiner places it
+        boxes = page_boxes.iloc[words['page_num'].to_numpy() - 1]
+        height = (boxes['top'] - boxes['bottom']).to_numpy()
+        scale = 72/(words['dpi'].to_numpy(dtype = float) if 'dpi' in words else dpi)
+        words = words.assign(
+            left = words['left'].to_numpy()*scale,
+            right = (words['left'] + words['width']).to_numpy()*scale,
+            bottom = height - (words['top'] + words['height']).to_numpy()*scale,
+            top = height - words['top'].to_numpy()*scale
+        )
+        regions = words.groupby(['page_num', 'block_num', 'par_num', 'line_num'], sort = False).agg(
+            left = ('left', 'min'),
+            right = ('right', 'max'),
+            bottom = ('bottom', 'min'),
+            top = ('top', 'max'),
+            text = ('text', ' '.join)
+        )
+        regions = regions.reset_index().rename(columns = {'page_num': 'page'})
+    elif all(x in data for x in REGION_COLUMNS):
+        regions = data[REGION_COLUMNS]
+        regions = regions[regions['text'].notna()]
+        regions = regions[regions['text'].str.strip() != '']
+        if lines:
+            from . import PDFMinerUtils
+
+            # rows of several words, e.g. text lines or boxes, are kept as they are
+            words = ~regions['text'].str.strip().str.contains(r'\s')
+            if words.any():
+                coalesced = PDFMinerUtils.coalesce_lines(regions[words])[REGION_COLUMNS]
+                regions = pd.concat([regions[~words], coalesced])
+                regions = regions.sort_values(by = ['page', 'top', 'left'], ascending = [True, False, True])
+    else:
+        raise ValueError("data must have the columns of Tesseract or PDFMiner data")
+
+    regions = regions[REGION_COLUMNS]
+    regions.index = range(regions.shape[0])
+
+    return regions
+
+def hash_regions(regions):
+    """Hash the content of regions, for data that does not come from a file."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(regions, index = False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+def quote_phrase(phrase):
+    """Quote a string as an FTS5 phrase, so it matches its words in order."""
+    return '"' + phrase.replace('"', '""') + '"'
+
+class SearchIndex:
+    """A full-text and positional index of extracted pdfs in SQLite.
+
+        The text of each region, e.g. a line of PDFMiner or Tesseract text,
+        is indexed with FTS5, and a side table holds its document, page and
+        bounding box, in pdf points from the bottom left of the page, under
+        the same row id, so a lookup returns where each match is. Documents
+        are keyed by source with a hash of the content and settings they were
+        indexed from, so updates re-index only documents that changed or are
+        indexed differently.
+
+        Parameters
+        ----------
+        path : str, required
+            The path of the SQLite database. Created if needed.
+        """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.con = sqlite3.connect(self.path, timeout = 60)
+        self.con.execute("PRAGMA journal_mode = WAL")
+        self.con.execute("PRAGMA synchronous = NORMAL")
+        with self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "doc_id INTEGER PRIMARY KEY, source TEXT UNIQUE, content_hash TEXT, regions INTEGER)"
+            )
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS regions ("
+                "region_id INTEGER PRIMARY KEY, doc_id INTEGER, page INTEGER, "
+                "left REAL, right REAL, bottom REAL, top REAL)"
+            )
+            self.con.execute("CREATE INDEX IF NOT EXISTS regions_doc ON regions (doc_id)")
+            self.con.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS regions_text USING fts5("
+                "text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+
+    def get_hash(self, source):
+        """Get the content hash a source was indexed from, or None."""
+        row = self.con.execute("SELECT content_hash FROM documents WHERE source = ?", (str(source),)).fetchone()
+
+        return None if row is None else row[0]
+
+    def remove(self, source):
+        """Remove a document and its regions from the index."""
+        with self.con:
+            self.delete(str(source))
+
+    def delete(self, source):
+        """Delete a document within the current transaction."""
+        row = self.con.execute("SELECT doc_id FROM documents WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return
+        self.con.execute(
+            "DELETE FROM regions_text WHERE rowid IN (SELECT region_id FROM regions WHERE doc_id = ?)", row
+        )
+        self.con.execute("DELETE FROM regions WHERE doc_id = ?", row)
+        self.con.execute("DELETE FROM documents WHERE doc_id = ?", row)
+
+    def add(self, source, data, content_hash = None, lines = True, page_boxes = None, dpi = 500):
+        """Index the data of a document, replacing what was indexed before.
+
+            Returns True if the document was indexed, or False if it was
+            already indexed from the same content and settings.
+
+            Parameters
+            ----------
+            source : str, required
+                The path or name of the document.
+            data : data frame, required
+                The Tesseract or PDFMiner data of the document, as get_regions
+                takes it.
+            content_hash : str, optional
+                A hash of the content of the document and the settings it was
+                extracted with. Defaults to None, hashing the file at source
+                lines and dpi if it exists, or else the regions.
+            lines : bool, optional
+                A boolean whether single words of PDFMiner data are coalesced
+                into lines, as described in get_regions. Defaults to True.
+            page_boxes : data frame, optional
+                The page boxes of the document, to convert Tesseract boxes to
+                points, as described in get_regions. Defaults to None, reading
+                them from the file at source if the data is Tesseract data.
+            dpi : int, optional
+                The resolution at which Tesseract data was rendered. Defaults
+                to 500.
+            """
+        source = str(source)
+        if page_boxes is None and 'word_num' in data and Path(source).is_file():
+            from . import PDFMinerUtils
+            page_boxes = PDFMinerUtils.get_page_boxes(source)
+        regions = get_regions(data, lines = lines, page_boxes = page_boxes, dpi = dpi)
+        if content_hash is None:
+            if Path(source).is_file():
+                content_hash = ResultCache.make_key(source, 'search_index', lines = lines, dpi = dpi)
+            else:
+                content_hash = hash_regions(regions)
+        if self.get_hash(source) == content_hash:
+            return False
+
+        with self.con:
+            self.delete(source)
+            doc_id = self.con.execute(
+                "INSERT INTO documents (source, content_hash, regions) VALUES (?, ?, ?)",
+                (source, content_hash, regions.shape[0])
+            ).lastrowid
+
+            # region ids continue from the largest, so the text shares them
+            start = self.con.execute("SELECT COALESCE(MAX(region_id), 0) + 1 FROM regions").fetchone()[0]
+            ids = list(range(start, start + regions.shape[0]))
+            coords = [regions[x].astype(float).tolist() for x in ['left', 'right', 'bottom', 'top']]
+            self.con.executemany(
+                "INSERT INTO regions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                zip(ids, [doc_id] * len(ids), regions['page'].astype(int).tolist(), *coords)
+            )
+            self.con.executemany(
+                "INSERT INTO regions_text (rowid, text) VALUES (?, ?)", zip(ids, regions['text'].tolist())
+            )
+
+        return True
+
+    def update(self, pdf_paths, backend = 'pdfminer_lines', lines = True, **options):
+        """Index the pdfs whose content changed since they were indexed.
+
+            Each pdf is hashed first with the backend, lines and options, and
+            only extracted and indexed if the hash differs from the one it was
+            indexed from, so updating a large corpus costs little more than
+            reading it, while changing a setting re-indexes every pdf.
+
+            Returns a dictionary with the number of pdfs indexed and skipped.
+
+            Parameters
+            ----------
+            pdf_paths : list, required
+                A list of the absolute paths of pdf documents.
+            backend : str, optional
+                The name of the extractor in Backends. Defaults to
+                'pdfminer_lines', a region for each line of the text layer.
+            lines : bool, optional
+                A boolean whether single words of PDFMiner data are coalesced
+                into lines, as described in get_regions. Defaults to True.
+            options : keyword arguments, optional
+                Options of the backend, e.g. dpi.
+            """
+        from . import Backends
+
+        extract = Backends.get_backend(backend)
+        counts = {'indexed': 0, 'skipped': 0}
+        for pdf_path in pdf_paths:
+            content_hash = ResultCache.make_key(
+                pdf_path, 'search_index', backend = backend, lines = lines, options = options
+            )
+            if self.get_hash(pdf_path) == content_hash:
+                counts['skipped'] = counts['skipped'] + 1
+                continue
+            data = pd.concat(list(extract(pdf_path, **options)))
+            self.add(pdf_path, data, content_hash = content_hash, lines = lines)
+            counts['indexed'] = counts['indexed'] + 1
+
+        return counts
+
+    def search(self, query, phrase = False, source = None, limit = 100):
+        """Look up regions by keywords or phrases.
+
+            Returns a data frame with a row for each matching region, best
+            match first, and the columns source, page, left, right, bottom,
+            top, text and score, the FTS5 rank, lower being better.
+
+            Parameters
+            ----------
+            query : str, required
+                An FTS5 query, e.g. 'payroll AND tax', '"net pay"' or 'acc*'.
+                Terms holding punctuation, e.g. net-pay, must be quoted as a
+                phrase, or a ValueError is raised.
+            phrase : bool, optional
+                A boolean whether the query is matched literally as a phrase,
+                e.g. an account number. Defaults to False.
+            source : str, optional
+                The source of a document to search within. Defaults to None,
+                searching every document.
+            limit : int, optional
+                The most regions returned. Defaults to 100.
+            """
+        if phrase:
+            query = quote_phrase(query)
+        sql = (
+            "SELECT d.source, r.page, r.left, r.right, r.bottom, r.top, t.text, t.rank AS score "
+            "FROM regions_text t JOIN regions r ON r.region_id = t.rowid "
+            "JOIN documents d ON d.doc_id = r.doc_id WHERE regions_text MATCH ?"
+        )
+        params = [query]
+        if source is not None:
+            sql = sql + " AND d.source = ?"
+            params.append(str(source))
+        sql = sql + " ORDER BY t.rank LIMIT ?"
+        params.append(limit)
+        try:
+            cursor = self.con.execute(sql, params)
+        except sqlite3.OperationalError as e:
+            raise ValueError(
+                f"invalid FTS5 query {query!r} ({e}); quote terms holding punctuation, "
+                f"e.g. '\"net-pay\"', or pass phrase = True"
+            ) from e
+
+        return pd.DataFrame(cursor.fetchall(), columns = [x[0] for x in cursor.description])
+
+    def documents(self):
+        """List the indexed documents with their content hashes and region counts."""
+        return pd.read_sql_query("SELECT source, content_hash, regions FROM documents", self.con)
+
+    def optimize(self):
+        """Merge the full-text index into one segment, e.g. after a large update."""
+        with self.con:
+            self.con.execute("INSERT INTO regions_text (regions_text) VALUES ('optimize')")
+
+    def close(self):
+        self.con.close()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 14 14:26:05 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+class PageGrid:
+    """A uniform grid over the boxes of one page.
+
+        Each box is registered in every cell it overlaps, and cells are stored
+        in compressed form: the box positions of cell i are
+        ids[starts[i]:starts[i + 1]].
+
+        Parameters
+        ----------
+        pos : array, required
+            The positions of the boxes in the coordinate arrays.
+        x0, x1, y0, y1 : array, required
+            The coordinate arrays of all boxes of the index.
+        cell_size : float, optional
+            The width and height of a cell. Defaults to None, choosing a size
+            that holds a few boxes per cell.
+        """
+    def __init__(self, pos, x0, x1, y0, y1, cell_size = None):
+        self.left = x0[pos].min()
+        self.bottom = y0[pos].min()
+        width = max(x1[pos].max() - self.left, 1e-9)
+        height = max(y1[pos].max() - self.bottom, 1e-9)
+        if cell_size is None:
+            cell_size = max(np.sqrt(width * height / pos.shape[0]) * 2, 1e-9)
+        self.cell_size = cell_size
+        self.nx = int(width // cell_size) + 1
+        self.ny = int(height // cell_size) + 1
+
+        # cell ranges of each box
+        cx0, cx1 = self.cells_x(x0[pos], x1[pos])
+        cy0, cy1 = self.cells_y(y0[pos], y1[pos])
+        nx = cx1 - cx0 + 1
+        ny = cy1 - cy0 + 1
+        counts = nx * ny
+
+        # one entry per box and overlapped cell
+        box = np.repeat(np.arange(pos.shape[0]), counts)
+        offset = np.arange(box.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = cx0[box] + offset % nx[box]
+        cy = cy0[box] + offset // nx[box]
+        cell = cy * self.nx + cx
+
+        order = np.argsort(cell, kind = 'stable')
+        self.ids = pos[box[order]]
+        self.starts = np.searchsorted(cell[order], np.arange(self.nx * self.ny + 1))
+
+    def cells_x(self, x0, x1):
+        """Get the first and last grid columns overlapping horizontal spans."""
+        c0 = np.clip(((x0 - self.left) // self.cell_size).astype(int), 0, self.nx - 1)
+        c1 = np.clip(((x1 - self.left) // self.cell_size).astype(int), 0, self.nx - 1)
+        return c0, c1
+
+    def cells_y(self, y0, y1):
+        """Get the first and last grid rows overlapping vertical spans."""
+        c0 = np.clip(((y0 - self.bottom) // self.cell_size).astype(int), 0, self.ny - 1)
+        c1 = np.clip(((y1 - self.bottom) // self.cell_size).astype(int), 0, self.ny - 1)
+        return c0, c1
+
+    def candidates(self, left, right, bottom, top):
+        """Get the positions of boxes in the cells overlapping a box."""
+        cx0, cx1 = self.cells_x(np.array([left]), np.array([right]))
+        cy0, cy1 = self.cells_y(np.array([bottom]), np.array([top]))
+        cells = (np.arange(cy0[0], cy1[0] + 1)[:, None] * self.nx + np.arange(cx0[0], cx1[0] + 1)).ravel()
+        ids = [self.ids[self.starts[x]:self.starts[x + 1]] for x in cells]
+
+        return np.unique(np.concatenate(ids))
+
+class SpatialIndex:
+    """A per-page spatial index over extracted pdf data.
+
+        Answers range, nearest-neighbour-in-direction and same-line queries
+        without scanning the whole data frame. Boxes are held in uniform grids,
+        one per page, built with NumPy. Queries return rows of the indexed data
+        frame, with its index.
+
+        Parameters
+        ----------
+        pdf_data : data frame, required
+            A data frame with the columns page, left, right, bottom and top,
+            with y increasing upwards, as returned by
+            PDFMinerUtils.extract_pdf_data or disperse. Use from_tesseract for
+            Tesseract data.
+        cell_size : float, optional
+            The width and height of a grid cell. Defaults to None, choosing a
+            size per page that holds a few boxes per cell.
+        """
+    def __init__(self, pdf_data, cell_size = None):
+        self.data = pdf_data
+        self.page = pdf_data['page'].to_numpy()
+        self.x0 = pdf_data['left'].to_numpy(dtype = float)
+        self.x1 = pdf_data['right'].to_numpy(dtype = float)
+        self.y0 = pdf_data['bottom'].to_numpy(dtype = float)
+        self.y1 = pdf_data['top'].to_numpy(dtype = float)
+        self.build(cell_size)
+
+    @classmethod
+    def from_tesseract(cls, data, cell_size = None):
+        """Index Tesseract data.
+
+            Returns a spatial index over the data returned by
+            TesseractUtils.extract_pdf_data. Only the word rows, of level 5
+            with text, are indexed, so queries never return the page, block,
+            paragraph or line boxes. The rows are renumbered from 0, as the
+            pages of the data each start at 0. Pixel boxes given by left, top,
+            width and height, with y increasing downwards, are flipped so that
+            above and below keep their meaning on the page.
+
+            Parameters
+            ----------
+            data : data frame, required
+                A data frame with the columns page_num, level, left, top,
+                width, height and text.
+            cell_size : float, optional
+                The width and height of a grid cell, in pixels. Defaults to
+                None.
+            """
+        words = (data['level'] == 5) & (data['text'].astype(str).str.strip() != '') & data['text'].notna()
+        data = data[words.to_numpy()].reset_index(drop = True)
+
+        index = cls.__new__(cls)
+        index.data = data
+        index.page = data['page_num'].to_numpy()
+        index.x0 = data['left'].to_numpy(dtype = float)
+        index.x1 = index.x0 + data['width'].to_numpy(dtype = float)
+        index.y1 = -data['top'].to_numpy(dtype = float)
+        index.y0 = index.y1 - data['height'].to_numpy(dtype = float)
+        index.build(cell_size)
+
+        return index
+
+    def build(self, cell_size = None):
+        """Build the grid of each page."""
+        valid = ~(np.isnan(self.x0) | np.isnan(self.x1) | np.isnan(self.y0) | np.isnan(self.y1))
+        self.grids = dict()
+        for page in pd.unique(self.page[valid]):
+            pos = np.flatnonzero(valid & (self.page == page))
+            self.grids[page] = PageGrid(pos, self.x0, self.x1, self.y0, self.y1, cell_size)
+
+    def position(self, row):
+        """Get the position of a row of the indexed data frame by its index label."""
+        return self.data.index.get_loc(row)
+
+    def rows(self, pos):
+        """Get the rows of the indexed data frame at positions."""
+        return self.data.iloc[pos]
+
+    def query_positions(self, page, left, right, bottom, top, contain = False):
+        """Get the positions of boxes overlapping, or contained in, a box."""
+        if page not in self.grids:
+            return np.array([], dtype = int)
+        pos = self.grids[page].candidates(left, right, bottom, top)
+
+        # exact test
+        if contain:
+            keep = (self.x0[pos] >= left) & (self.x1[pos] <= right) & (self.y0[pos] >= bottom) & (self.y1[pos] <= top)
+        else:
+            keep = (self.x0[pos] <= right) & (self.x1[pos] >= left) & (self.y0[pos] <= top) & (self.y1[pos] >= bottom)
+
+        return pos[keep]
+
+    def within(self, page, left, right, bottom, top, contain = True):
+        """Find the rows inside a box.
+
+            Returns the rows of the indexed data frame on the page whose boxes
+            lie inside the box, or overlap it if contain is False.
+
+            Parameters
+            ----------
+            page : int, required
+                The page number.
+            left, right, bottom, top : float, required
+                The boundaries of the box, in the coordinates of the indexed
+                data, with bottom below top. For Tesseract data, pass negated
+                pixel rows: bottom = -(top + height), top = -top.
+            contain : bool, optional
+                A boolean whether boxes must lie fully inside the box rather
+                than overlap it. Defaults to True.
+            """
+        pos = self.query_positions(page, left, right, bottom, top, contain = contain)
+
+        return self.rows(np.sort(pos))
+
+    def same_line(self, row, overlap = 0.5):
+        """Find the rows on the same line as a row.
+
+            Returns the rows of the indexed data frame on the page of the row,
+            including the row itself, whose vertical extent overlaps that of
+            the row by at least the fraction overlap of the smaller of the two
+            heights, ordered from left to right.
+
+            Parameters
+            ----------
+            row : index label, required
+                A valid row index of the indexed data frame.
+            overlap : float, optional
+                The minimum fraction of vertical overlap. Defaults to 0.5.
+            """
+        i = self.position(row)
+        grid = self.grids[self.page[i]]
+        page_right = grid.left + grid.nx * grid.cell_size
+        pos = self.query_positions(self.page[i], grid.left, page_right, self.y0[i], self.y1[i])
+        pos = pos[self.vertical_overlap(i, pos) >= overlap]
+
+        return self.rows(pos[np.argsort(self.x0[pos], kind = 'stable')])
+
+    def vertical_overlap(self, i, pos):
+        """Get the vertical overlap of boxes with box i, relative to the smaller height."""
+        overlap = np.minimum(self.y1[pos], self.y1[i]) - np.maximum(self.y0[pos], self.y0[i])
+        height = np.minimum(self.y1[pos] - self.y0[pos], self.y1[i] - self.y0[i])
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            overlap = np.where(height > 0, overlap / height, (overlap >= 0).astype(float))
+
+        return overlap
+
+    def horizontal_overlap(self, i, pos):
+        """Get the horizontal overlap of boxes with box i, relative to the smaller width."""
+        overlap = np.minimum(self.x1[pos], self.x1[i]) - np.maximum(self.x0[pos], self.x0[i])
+        width = np.minimum(self.x1[pos] - self.x0[pos], self.x1[i] - self.x0[i])
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            overlap = np.where(width > 0, overlap / width, (overlap >= 0).astype(float))
+
+        return overlap
+
+    def nearest(self, row, direction = 'right', max_distance = None, overlap = 0.5, k = 1):
+        """Find the nearest rows in a direction from a row.
+
+            Returns up to k rows of the indexed data frame on the page of the
+            row that lie entirely in the direction from it and overlap it by
+            at least the fraction overlap across that direction, nearest first.
+            E.g. the value right of a label is nearest(label_row, 'right').
+
+            Parameters
+            ----------
+            row : index label, required
+                A valid row index of the indexed data frame.
+            direction : str, optional
+                A string 'right', 'left', 'above' or 'below'. Defaults to
+                'right'.
+            max_distance : float, optional
+                The largest gap between the row and a result. Defaults to None,
+                searching to the edge of the page.
+            overlap : float, optional
+                The minimum fraction of overlap across the direction, relative
+                to the smaller of the two boxes. Defaults to 0.5.
+            k : int, optional
+                The maximum number of rows returned. Defaults to 1.
+            """
+        i = self.position(row)
+        grid = self.grids[self.page[i]]
+        far = grid.nx * grid.cell_size + grid.ny * grid.cell_size
+        reach = far if max_distance is None else max_distance
+
+        # search the band in the direction, then measure gaps
+        if direction == 'right':
+            band = (self.x1[i], self.x1[i] + reach, self.y0[i], self.y1[i])
+        elif direction == 'left':
+            band = (self.x0[i] - reach, self.x0[i], self.y0[i], self.y1[i])
+        elif direction == 'above':
+            band = (self.x0[i], self.x1[i], self.y1[i], self.y1[i] + reach)
+        elif direction == 'below':
+            band = (self.x0[i], self.x1[i], self.y0[i] - reach, self.y0[i])
+        else:
+            raise ValueError("direction must be either right, left, above or below")
+        pos = self.query_positions(self.page[i], *band)
+        pos = pos[pos != i]
+
+        if direction == 'right':
+            gap = self.x0[pos] - self.x1[i]
+            across = self.vertical_overlap(i, pos)
+        elif direction == 'left':
+            gap = self.x0[i] - self.x1[pos]
+            across = self.vertical_overlap(i, pos)
+        elif direction == 'above':
+            gap = self.y0[pos] - self.y1[i]
+            across = self.horizontal_overlap(i, pos)
+        else:
+            gap = self.y0[i] - self.y1[pos]
+            across = self.horizontal_overlap(i, pos)
+
+        keep = (gap >= 0) & (gap <= reach) & (across >= overlap)
+        pos = pos[keep]
+        pos = pos[np.argsort(gap[keep], kind = 'stable')][:k]
+
+        return self.rows(pos)
+
+    def find_text(self, text, page = None):
+        """Find the rows whose text equals a string.
+
+            Returns the rows of the indexed data frame, optionally on one page,
+            whose stripped text equals text. Useful to locate labels before
+            querying around them.
+
+            Parameters
+            ----------
+            text : str, required
+                The text of a label.
+            page : int, optional
+                The page number. Defaults to None, searching all pages.
+            """
+        match = self.data['text'].astype(str).str.strip().to_numpy() == text
+        if page is not None:
+            match = match & (self.page == page)
+
+        return self.rows(np.flatnonzero(match))
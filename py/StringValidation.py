@@ -6,10 +6,10 @@ Created on Mon Jul 24 12:28:10 2023
 """
 
 from time import strptime
-def is_valid_date(string):
+def is_valid_date(string, date_format = '%m/%d/%Y'):
     """Checks if a string is a valid date"""
     try:
-        strptime(string, '%m/%d/%Y')
+        strptime(string, date_format)
         return True
     except ValueError:
         return False
@@ -29,4 +29,218 @@ def remove_string(x, string):
     for inner_list in x:
         for i in range(len(inner_list)):
             inner_list[i] = inner_list[i].replace(string, '')
-    return x
\ No newline at end of file
+    return x
+
+import numpy as np
+import pandas as pd
+
+# arrow arrays are scanned and cleaned natively if pyarrow is available
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+def is_valid_date_vec(strings, date_format = '%m/%d/%Y'):
+    """Checks which strings of a series are valid dates, as is_valid_date does"""
+    strings = pd.Series(strings, dtype = object)
+    dates = pd.to_datetime(strings, format = date_format, errors = 'coerce')
+    valid = dates.notna() & strings.notna()
+    
+    # dates outside the range of pandas timestamps, 1677 to 2262, coerce to 
+    # missing, so strings that failed are checked one by one as strptime does
+    retry = dates.isna() & strings.map(lambda x: isinstance(x, str))
+    if retry.any():
+        valid[retry] = [is_valid_date(x, date_format) for x in strings[retry]]
+    
+    return valid
+
+def is_ssn_vec(strings):
+    """Checks which strings of a series are valid social security numbers, as is_ssn does"""
+    strings = pd.Series(strings, dtype = object)
+    
+    return strings.str.match(r'^\d{9}$').fillna(False).astype(bool)
+
+# patterns found inside text, with validators confirming their matches
+DEFAULT_PATTERNS = {
+    'date': (r'\b\d{1,2}/\d{1,2}/\d{4}\b', is_valid_date_vec),
+    'ssn': (r'(?<![\d-])(?:\d{9}|\d{3}-\d{2}-\d{4})(?![\d-])', None)
+}
+
+class Scanner:
+    """Finds several patterns in a column of strings in a single pass.
+
+        The patterns are compiled into one regular expression of named 
+        alternatives, so each string is scanned once for all of them, by 
+        Series.str.extractall rather than a loop over the strings. Matches
+        of a pattern with a validator are kept only if the validator accepts
+        them, e.g. dates must exist on the calendar.
+
+        Parameters
+        ----------
+        patterns : dict, optional
+            A dictionary of patterns keyed by name. Each pattern is a regular
+            expression, or a tuple of a regular expression and a validator 
+            taking a series of matched strings and returning a boolean series.
+            Defaults to DEFAULT_PATTERNS, dates and social security numbers.
+        """
+    def __init__(self, patterns = None):
+        self.patterns = dict()
+        self.validators = dict()
+        for name, pattern in (DEFAULT_PATTERNS if patterns is None else patterns).items():
+            if isinstance(pattern, str):
+                self.register(name, pattern)
+            else:
+                self.register(name, *pattern)
+    
+    def register(self, name, pattern, validator = None):
+        """Add a pattern to the scanner.
+
+            Parameters
+            ----------
+            name : str, required
+                A name of the pattern, usable as a Python identifier.
+            pattern : str, required
+                A regular expression without named groups.
+            validator : callable, optional
+                A function taking a series of matched strings and returning a
+                boolean series of those to keep. Defaults to None.
+            """
+        if not name.isidentifier() or name.startswith('_'):
+            raise ValueError("name must be a valid identifier not starting with an underscore")
+        re.compile(pattern)
+        self.patterns[name] = pattern
+        self.validators[name] = validator
+        self.regex = re.compile('|'.join(f'(?P<{x}>{y})' for x, y in self.patterns.items()))
+        
+        # each match also captures the text skipped since the previous one, 
+        # from which spans are counted, and the end of the string ends the 
+        # last gap so no start is searched twice
+        self.scan_regex = re.compile(r'(?s)(?P<_gap>.*?)(?:' + self.regex.pattern + r'|\Z)')
+    
+    def scan(self, strings):
+        """Find all matches of all patterns.
+
+            Returns a data frame with a row for each match and the columns 
+            row, the index label of the string, pattern, a categorical of the
+            pattern names, match, the matched text, and start and end, its 
+            span in the string.
+
+            Parameters
+            ----------
+            strings : series, required
+                A series of strings, e.g. the text column of extracted pdf 
+                data. Missing values have no matches.
+            """
+        strings = pd.Series(strings)
+        names = list(self.patterns)
+        found = strings.reset_index(drop = True).astype(object).str.extractall(self.scan_regex)
+        position = found.index.get_level_values(0).to_numpy()
+        
+        # the match of each row is in the column of its pattern
+        is_found = found[names].notna().to_numpy()
+        match = found[names].bfill(axis = 1).iloc[:, 0].astype(object)
+        match_len = match.str.len().fillna(0).to_numpy(dtype = np.int64)
+        
+        # empty gaps are missing, as extractall reports empty groups
+        end = found['_gap'].astype(object).str.len().fillna(0).to_numpy(dtype = np.int64) + match_len
+        end = pd.Series(end).groupby(position).cumsum().to_numpy()
+        
+        hit = is_found.any(axis = 1)
+        found = pd.DataFrame({
+            'row': strings.index.take(position[hit]),
+            'pattern': pd.Categorical.from_codes(is_found[hit].argmax(axis = 1), categories = names),
+            'match': pd.array(match[hit].to_numpy(dtype = object), dtype = 'string'),
+            'start': end[hit] - match_len[hit],
+            'end': end[hit]
+        })
+        
+        # drop matches their validators reject
+        keep = np.ones(found.shape[0], dtype = bool)
+        for name, validator in self.validators.items():
+            is_name = (found['pattern'] == name).to_numpy()
+            if validator is not None and is_name.any():
+                valid = validator(found.loc[is_name, 'match'].astype(object))
+                keep[is_name] = np.asarray(valid, dtype = bool)
+        found = found[keep]
+        found.index = range(found.shape[0])
+        
+        return found
+    
+    def match_columns(self, strings):
+        """Get the first match of each pattern in each string.
+
+            Returns a data frame aligned with strings, with a string column per
+            pattern holding its first match, and integer columns 
+            <pattern>_start and <pattern>_end holding its span, missing where
+            the pattern was not found.
+
+            Parameters
+            ----------
+            strings : series, required
+                A series of strings.
+            """
+        strings = pd.Series(strings)
+        found = self.scan(strings).drop_duplicates(['row', 'pattern'])
+        columns = dict()
+        for name in self.patterns:
+            first = found[found['pattern'] == name].set_index('row')
+            columns[name] = first['match'].reindex(strings.index).astype('string')
+            columns[name + '_start'] = first['start'].reindex(strings.index).astype('Int64')
+            columns[name + '_end'] = first['end'].reindex(strings.index).astype('Int64')
+        
+        return pd.DataFrame(columns, index = strings.index)
+    
+    def scan_frame(self, pdf_data, column = 'text'):
+        """Add the match columns of a text column to a data frame.
+
+            Returns a copy of pdf_data with the columns of match_columns, e.g.
+            for the data returned by PDFMinerUtils.extract_pdf_data or 
+            TesseractUtils.extract_pdf_data.
+
+            Parameters
+            ----------
+            pdf_data : data frame, required
+                A data frame with a column of strings.
+            column : str, optional
+                The name of the column of strings. Defaults to 'text'.
+            """
+        return pd.concat([pdf_data, self.match_columns(pdf_data[column])], axis = 1)
+
+def remove_strings(x, strings):
+    """Remove strings from many strings at once.
+
+        Returns the strings with every occurrence of each of the strings 
+        removed, in the type given: a list of lists, as remove_string takes,
+        a series, or a pyarrow array.
+
+        Parameters
+        ----------
+        x : list, series or array, required
+            A list of lists of strings, a series of strings, or a pyarrow 
+            string array or chunked array.
+        strings : str or list, required
+            A string or a list of strings to remove.
+        """
+    if isinstance(strings, str):
+        strings = [strings]
+    strings = [s for s in strings if s != '']
+    if len(strings) == 0:
+        return x
+    pattern = '|'.join(re.escape(s) for s in sorted(strings, key = len, reverse = True))
+    
+    if pa is not None and isinstance(x, (pa.Array, pa.ChunkedArray)):
+        if len(strings) == 1:
+            return pc.replace_substring(x, strings[0], '')
+        return pc.replace_substring_regex(x, pattern, '')
+    if isinstance(x, pd.Series):
+        if len(strings) == 1:
+            return x.str.replace(strings[0], '', regex = False)
+        return x.str.replace(pattern, '', regex = True)
+    
+    regex = re.compile(pattern)
+    for inner_list in x:
+        for i in range(len(inner_list)):
+            inner_list[i] = regex.sub('', inner_list[i])
+    return x
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:02:45 2026
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from concurrent.futures import ProcessPoolExecutor
+
+import os
+import json
+import time
+import shutil
+import pandas as pd
+
+from . import PDFMinerUtils
+
+# the columns and types of every cell frame, whichever engine extracted it
+CELL_TYPES = {
+    'source': 'object', 'table': 'int32', 'page': 'int32', 'row': 'int32', 'col': 'int32', 'text': 'object'
+}
+
+TIMING_COLUMNS = ['source', 'engine', 'pages', 'tables', 'cells', 'seconds', 'error']
+
+def get_cells(source, tables):
+    """Convert tables to a long data frame of cells.
+
+        Returns a data frame with a row for each cell and the columns of
+        CELL_TYPES, so the tables of any engine and any width can be
+        concatenated and written in bulk.
+
+        Parameters
+        ----------
+        source : str, required
+            The path of the pdf of the tables.
+        tables : list, required
+            A list of tuples of a page number and the rows of a table, as lists
+            of cell strings.
+        """
+    cols = {x: [] for x in CELL_TYPES}
+    for table_num, (page_num, rows) in enumerate(tables, start = 1):
+        for row_num, row in enumerate(rows):
+            for col_num, text in enumerate(row):
+                cols['table'].append(table_num)
+                cols['page'].append(page_num)
+                cols['row'].append(row_num)
+                cols['col'].append(col_num)
+                cols['text'].append(text)
+    cols['source'] = [str(source)] * len(cols['text'])
+
+    return pd.DataFrame(cols).astype(CELL_TYPES)
+
+def get_tables(cells):
+    """Convert a data frame of cells back to tables.
+
+        Returns a list with a wide data frame of strings for each table, in
+        order of source and table number, with the page number in attrs.
+
+        Parameters
+        ----------
+        cells : data frame, required
+            A data frame of cells, as returned by extract_tables.
+        """
+    tables = []
+    for (_, _), table in cells.groupby(['source', 'table'], sort = False):
+        df = table.pivot(index = 'row', columns = 'col', values = 'text').fillna('')
+        df.index.name, df.columns.name = None, None
+        df.attrs['page'] = int(table['page'].iloc[0])
+        tables.append(df)
+
+    return tables
+
+def concat_cells(frames):
+    """Concatenate data frames of cells, keeping their types when empty."""
+    if len(frames) == 0:
+        return get_cells(None, [])
+    cells = pd.concat(frames)
+    cells.index = range(cells.shape[0])
+
+    return cells
+
+def parse_tabula_json(tables):
+    """Get the page number and rows of each table of tabula's JSON output."""
+    return [
+        (int(x.get('page_number', 0)), [[cell['text'] for cell in row] for row in x['data']])
+        for x in tables
+    ]
+
+def read_tabula(pdf_path, pages = 'all', lattice = False):
+    """Extract the tables of one pdf with tabula, in a JVM of its own.
+
+        Returns a list of tuples of a page number and rows, as for get_cells.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        pages : str, optional
+            The pages, as tabula takes them. Defaults to 'all'.
+        lattice : bool, optional
+            A boolean whether tables are found from ruling lines rather than
+            from the layout of the text. Defaults to False.
+        """
+    import tabula
+
+    tables = tabula.read_pdf(str(pdf_path), pages = pages, lattice = lattice, output_format = 'json')
+
+    return parse_tabula_json(tables)
+
+def read_tabula_batch(pdf_paths, pages = 'all', lattice = False):
+    """Extract the tables of many pdfs with tabula in one JVM.
+
+        Every pdf is linked into a temporary folder that tabula converts in a
+        single batch run, so the JVM starts once rather than once per pdf.
+
+        Returns a list with the result of read_tabula for each pdf.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of the absolute paths of pdf documents.
+        pages : str, optional
+            The pages, as tabula takes them. Defaults to 'all'.
+        lattice : bool, optional
+            A boolean whether tables are found from ruling lines. Defaults to
+            False.
+        """
+    import tabula
+
+    with TemporaryDirectory() as tempdir:
+        tempdir = Path(tempdir)
+        for i, pdf_path in enumerate(pdf_paths):
+            link = tempdir / f'{i:06}.pdf'
+            try:
+                os.link(pdf_path, link)
+            except OSError:
+                shutil.copyfile(pdf_path, link)
+
+        tabula.convert_into_by_batch(str(tempdir), output_format = 'json', pages = pages, lattice = lattice)
+
+        results = []
+        for i in range(len(pdf_paths)):
+            with open(tempdir / f'{i:06}.json', encoding = 'utf-8') as fp:
+                results.append(parse_tabula_json(json.load(fp)))
+
+    return results
+
+def read_camelot_pages(pdf_path, pages, **kwargs):
+    """Extract the tables of some pages of a pdf with camelot lattice.
+
+        Returns a tuple of a list of tuples of a page number and rows, as for
+        get_cells, and the seconds taken.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        pages : list, required
+            A list of page numbers, starting at 1.
+        kwargs : keyword arguments, optional
+            Additional arguments of camelot.read_pdf.
+        """
+    import camelot
+
+    start = time.perf_counter()
+    pages = ','.join(str(x) for x in pages)
+    tables = camelot.read_pdf(str(pdf_path), flavor = 'lattice', pages = pages, **kwargs)
+    tables = [(int(x.page), x.df.values.tolist()) for x in tables]
+
+    return tables, time.perf_counter() - start
+
+def get_timing(source, engine, pages, tables, seconds, error = None):
+    """Get the timing record of a document."""
+    return {
+        'source': str(source), 'engine': engine, 'pages': pages, 'tables': len(tables),
+        'cells': sum(len(row) for _, rows in tables for row in rows), 'seconds': seconds,
+        'error': error
+    }
+
+def extract_tabula(pdf_paths, pages = 'all', lattice = False, batch_size = 200):
+    """Extract the tables of many pdfs with tabula, amortizing the JVM.
+
+        Pdfs are converted in batches that share one JVM. The seconds of a
+        document are its share of the seconds of its batch. If a batch fails,
+        e.g. on a damaged pdf, its documents are extracted one at a time so
+        only the damaged ones fail.
+
+        Returns a tuple of a data frame of cells, as returned by get_cells, and
+        a data frame of timings with a row for each document.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of the absolute paths of pdf documents.
+        pages : str or list, optional
+            The pages, as tabula takes them. Defaults to 'all'.
+        lattice : bool, optional
+            A boolean whether tables are found from ruling lines. Defaults to
+            False.
+        batch_size : int, optional
+            The number of pdfs per JVM. Defaults to 200.
+        """
+    pdf_paths = list(pdf_paths)
+    # the number of pages of a document is only known when they are listed
+    n_pages = len(pages) if isinstance(pages, (list, tuple)) else None
+    frames, timings = [], []
+    for i in range(0, len(pdf_paths), batch_size):
+        batch = pdf_paths[i:i + batch_size]
+        start = time.perf_counter()
+        try:
+            results = read_tabula_batch(batch, pages = pages, lattice = lattice)
+            seconds = (time.perf_counter() - start)/len(batch)
+            for pdf_path, tables in zip(batch, results):
+                frames.append(get_cells(pdf_path, tables))
+                timings.append(get_timing(pdf_path, 'tabula', n_pages, tables, seconds))
+        except Exception:
+            for pdf_path in batch:
+                start = time.perf_counter()
+                try:
+                    tables = read_tabula(pdf_path, pages = pages, lattice = lattice)
+                    error = None
+                except Exception as e:
+                    tables, error = [], f"{type(e).__name__}: {e}"
+                frames.append(get_cells(pdf_path, tables))
+                timings.append(get_timing(pdf_path, 'tabula', n_pages, tables, time.perf_counter() - start, error))
+
+    return concat_cells(frames), pd.DataFrame(timings, columns = TIMING_COLUMNS)
+
+def extract_camelot(pdf_paths, pages = None, workers = None, pages_per_task = 1, **kwargs):
+    """Extract the tables of many pdfs with camelot lattice, in parallel over pages.
+
+        The pages of every pdf are split into tasks that run across one
+        process pool, so both a long pdf and many short ones keep every
+        worker busy. The seconds of a document are the sum of the seconds of
+        its tasks, which may have run at the same time.
+
+        Returns a tuple of a data frame of cells, as returned by get_cells, and
+        a data frame of timings with a row for each document.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of the absolute paths of pdf documents.
+        pages : list, optional
+            A list of page numbers extracted from every pdf. Defaults to None,
+            extracting every page.
+        workers : int, optional
+            The number of processes. If None, one process per core is used. If
+            1, tasks run one after another in this process, e.g. inside a
+            worker of BatchIngest. Defaults to None.
+        pages_per_task : int, optional
+            The number of pages of each task. Defaults to 1.
+        kwargs : keyword arguments, optional
+            Additional arguments of camelot.read_pdf, e.g. line_scale.
+        """
+    pdf_paths = list(pdf_paths)
+    tasks = []
+    doc_pages = []
+    # documents whose pages could not be counted, e.g. corrupt pdfs, fail alone
+    count_errors = dict()
+    for pdf_path in pdf_paths:
+        try:
+            page_nums = list(pages) if pages is not None else list(range(1, PDFMinerUtils.get_page_count(pdf_path) + 1))
+        except Exception as e:
+            count_errors[pdf_path] = f"{type(e).__name__}: {e}"
+            doc_pages.append(None)
+            continue
+        doc_pages.append(len(page_nums))
+        tasks.extend(
+            (pdf_path, page_nums[i:i + pages_per_task]) for i in range(0, len(page_nums), pages_per_task)
+        )
+
+    def collect(outcomes):
+        results = {x: ([], 0.0, count_errors.get(x)) for x in pdf_paths}
+        for (pdf_path, _), outcome in zip(tasks, outcomes):
+            tables, seconds, error = results[pdf_path]
+            try:
+                new_tables, new_seconds = outcome()
+                results[pdf_path] = (tables + new_tables, seconds + new_seconds, error)
+            except Exception as e:
+                results[pdf_path] = (tables, seconds, error or f"{type(e).__name__}: {e}")
+        return results
+
+    if workers != 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            futures = [executor.submit(read_camelot_pages, pdf_path, x, **kwargs) for pdf_path, x in tasks]
+            results = collect(x.result for x in futures)
+    else:
+        results = collect(
+            (lambda pdf_path = pdf_path, x = x: read_camelot_pages(pdf_path, x, **kwargs)) for pdf_path, x in tasks
+        )
+
+    frames, timings = [], []
+    for pdf_path, n_pages in zip(pdf_paths, doc_pages):
+        tables, seconds, error = results[pdf_path]
+        frames.append(get_cells(pdf_path, tables))
+        timings.append(get_timing(pdf_path, 'camelot', n_pages, tables, seconds, error))
+
+    return concat_cells(frames), pd.DataFrame(timings, columns = TIMING_COLUMNS)
+
+def extract_tables(pdf_paths, engine = 'camelot', **kwargs):
+    """Extract the tables of many pdfs in bulk.
+
+        Returns a tuple of a data frame of cells and a data frame of timings.
+        The cells have the columns source, table, page, row, col and text with
+        the same types for every engine, and can be turned back into wide
+        tables with get_tables. The timings have a row for each document with
+        the columns source, engine, pages, tables, cells, seconds and error,
+        the error of a document that failed or None.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of the absolute paths of pdf documents.
+        engine : str, optional
+            A string 'camelot' for camelot lattice, in parallel over pages, or
+            'tabula' for tabula, in batches sharing one JVM. Defaults to
+            'camelot'.
+        kwargs : keyword arguments, optional
+            Additional arguments of extract_camelot or extract_tabula.
+        """
+    if engine == 'camelot':
+        return extract_camelot(pdf_paths, **kwargs)
+    if engine == 'tabula':
+        return extract_tabula(pdf_paths, **kwargs)
+
+    raise ValueError("engine must be either camelot or tabula")
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 14:03:27 2026
+"""
+
+from pathlib import Path
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from pdf2image import convert_from_path
+
+import io
+import subprocess
+import pytesseract
+import numpy as np
+import pandas as pd
+
+from . import PDFMinerUtils, TesseractUtils
+
+def get_region_pixels(template, page_boxes, dpi, units = 'points'):
+    """Convert template regions to pixel boxes of rendered pages.
+
+        Returns a data frame with the columns x, y, width and height of each
+        region, in pixels from the top left of its page rendered at dpi.
+
+        Parameters
+        ----------
+        template : data frame, required
+            A data frame with the columns page, left, right, bottom and top.
+        page_boxes : data frame, required
+            The media boxes of the pages, as returned by
+            PDFMinerUtils.get_page_boxes, which poppler renders. The extent
+            of the text, e.g. of PDFMinerUtils.get_page_coordinates, is not
+            a page box.
+        dpi : int, required
+            The resolution at which pages are rendered.
+        units : str, optional
+            A string 'points' if regions are given in pdf points from the
+            bottom left of the page, as PDFMiner gives coordinates whatever
+            the origin of the media box, or 'fraction' if they are given as
+            fractions of the page from its bottom left. Defaults to 'points'.
+        """
+    if units not in ('points', 'fraction'):
+        raise ValueError("units must be either points or fraction")
+
+    boxes = page_boxes.iloc[template['page'].to_numpy() - 1]
+    if ((boxes['right'] <= boxes['left']) | (boxes['top'] <= boxes['bottom'])).any():
+        raise ValueError("page_boxes must be media boxes, as returned by PDFMinerUtils.get_page_boxes")
+    # PDFMiner moves the origin of the media box to 0
+    page_width = (boxes['right'] - boxes['left']).to_numpy(dtype = float)
+    page_height = (boxes['top'] - boxes['bottom']).to_numpy(dtype = float)
+    left = template['left'].to_numpy(dtype = float)
+    right = template['right'].to_numpy(dtype = float)
+    bottom = template['bottom'].to_numpy(dtype = float)
+    top = template['top'].to_numpy(dtype = float)
+
+    # fractions of the page to points
+    if units == 'fraction':
+        left, right = left*page_width, right*page_width
+        bottom, top = bottom*page_height, top*page_height
+
+    # points from the bottom left to pixels from the top left
+    scale = dpi/72
+    x = np.floor(left*scale).astype(int)
+    y = np.floor((page_height - top)*scale).astype(int)
+    width = np.ceil(right*scale).astype(int) - x
+    height = np.ceil((page_height - bottom)*scale).astype(int) - y
+
+    return pd.DataFrame({
+        'x': np.maximum(x, 0),
+        'y': np.maximum(y, 0),
+        'width': np.maximum(width, 1),
+        'height': np.maximum(height, 1)
+    }, index = template.index)
+
+def render_region(pdf_path, page_num, box, dpi = 300, grayscale = True):
+    """Render only a region of a pdf page.
+
+        Returns the region as a PIL image. Poppler rasterizes only the pixels
+        of the region, which is much cheaper than rendering the whole page.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        box : tuple, required
+            The x, y, width and height of the region in pixels from the top
+            left of the page, as returned by get_region_pixels.
+        dpi : int, optional
+            The resolution at which the region is rendered. Defaults to 300.
+        grayscale : bool, optional
+            A boolean whether the region is rendered in grayscale. Defaults to
+            True.
+        """
+    poppler_path = TesseractUtils.get_poppler_path()
+    pdftoppm = 'pdftoppm' if poppler_path is None else str(Path(poppler_path) / 'pdftoppm')
+    x, y, width, height = (int(v) for v in box)
+
+    cmd = [
+        pdftoppm, '-r', str(dpi), '-f', str(page_num), '-l', str(page_num),
+        '-x', str(x), '-y', str(y), '-W', str(width), '-H', str(height)
+    ]
+    if grayscale:
+        cmd.append('-gray')
+    result = subprocess.run(cmd + [str(pdf_path)], capture_output = True, check = True)
+
+    return Image.open(io.BytesIO(result.stdout))
+
+def ocr_region(image, page_num, config = '--psm 6'):
+    """OCR the image of a region.
+
+        Returns a tuple of the text of the region, with lines separated by new
+        lines, and the mean confidence of its words.
+
+        Parameters
+        ----------
+        image : image, required
+            A PIL image of the region.
+        page_num : int, required
+            The page number of the region.
+        config : str, optional
+            The Tesseract options. Defaults to '--psm 6', a uniform block of
+            text.
+        """
+    data = TesseractUtils.parse_page_data(pytesseract.image_to_data(image, config = config), page_num)
+
+    return TesseractUtils.get_page_text(data).strip(), TesseractUtils.get_page_confidence(data)
+
+def ocr_regions(pdf_path, page_num, boxes, dpi = 300, render = 'regions', config = '--psm 6', 
+                preprocess = None):
+    """OCR a group of regions of one pdf page.
+
+        Returns a list with the result of ocr_region for each region.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the regions, starting at 1.
+        boxes : list, required
+            A list of pixel boxes, as rows of get_region_pixels.
+        dpi : int, optional
+            The resolution at which regions are rendered. Defaults to 300.
+        render : str, optional
+            A string 'regions' to render each region on its own, or 'page' to
+            render the page once and crop the regions from it. Defaults to
+            'regions'.
+        config : str, optional
+            The Tesseract options. Defaults to '--psm 6'.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each
+            region before OCR. Defaults to None.
+        """
+    if render == 'page':
+        page = convert_from_path(
+            Path(pdf_path), dpi, first_page = page_num, last_page = page_num,
+            grayscale = True, poppler_path = TesseractUtils.get_poppler_path()
+        )[0]
+        images = [page.crop((x, y, x + w, y + h)) for x, y, w, h in boxes]
+    else:
+        images = [render_region(pdf_path, page_num, x, dpi = dpi) for x in boxes]
+
+    if preprocess is not None:
+        images = [preprocess(x) for x in images]
+
+    return [ocr_region(x, page_num, config = config) for x in images]
+
+def extract_template_fields(pdf_path, template, dpi = 300, units = 'points', page_boxes = None,
+                            render = 'regions', config = '--psm 6', preprocess = None, workers = 1):
+    """OCR only the named regions of a fixed-layout pdf.
+
+        Returns a data frame with a row for each field of the template and the
+        columns field, page, value and conf, the mean word confidence from 0 to
+        100, or 0 if no words were found. Only the regions are rendered and
+        OCRed, rather than whole pages.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        template : data frame or list, required
+            A data frame, or a list of dictionaries, with the columns field,
+            page, left, right, bottom and top, with y increasing upwards, and
+            optionally config for per-field Tesseract options, e.g. '--psm 7'
+            for a single line.
+        dpi : int, optional
+            The resolution at which regions are rendered. Defaults to 300.
+        units : str, optional
+            A string 'points' or 'fraction', as described in
+            get_region_pixels. Defaults to 'points'.
+        page_boxes : data frame, optional
+            The media boxes of the pages, as described in get_region_pixels.
+            Defaults to None, reading them with PDFMinerUtils.get_page_boxes.
+        render : str, optional
+            A string 'regions' to render each region on its own, or 'page' to
+            render each page once and crop its regions. Rendering pages pays
+            off when regions cover much of a page. Defaults to 'regions'.
+        config : str, optional
+            The Tesseract options of fields without their own. Defaults to
+            '--psm 6'.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each
+            region before OCR. Defaults to None.
+        workers : int, optional
+            The number of processes over which regions are OCRed. If None, one
+            process per core is used. Defaults to 1.
+        """
+    if render not in ('regions', 'page'):
+        raise ValueError("render must be either regions or page")
+
+    template = pd.DataFrame(template)
+    template.index = range(template.shape[0])
+    if page_boxes is None:
+        page_boxes = PDFMinerUtils.get_page_boxes(pdf_path)
+    boxes = get_region_pixels(template, page_boxes, dpi, units = units)
+    if 'config' in template:
+        configs = template['config'].fillna(config)
+    else:
+        configs = pd.Series(config, index = template.index)
+
+    # one task per region, or per page and config when rendering pages
+    if render == 'page':
+        groups = template.groupby([template['page'], configs], sort = False).indices
+        groups = [x.tolist() for x in groups.values()]
+    else:
+        groups = [[x] for x in template.index]
+    tasks = [
+        (
+            pdf_path, int(template.at[x[0], 'page']), [tuple(boxes.loc[i]) for i in x], 
+            dpi, render, configs[x[0]], preprocess
+        )
+        for x in groups
+    ]
+
+    if workers != 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers = workers, initializer = TesseractUtils.init_ocr_worker
+        ) as executor:
+            results = list(executor.map(ocr_regions, *zip(*tasks)))
+    else:
+        results = [ocr_regions(*x) for x in tasks]
+
+    # back to template order
+    values = [None] * template.shape[0]
+    for x, result in zip(groups, results):
+        for i, value in zip(x, result):
+            values[i] = value
+
+    fields = pd.DataFrame({
+        'field': template['field'].to_numpy(),
+        'page': template['page'].to_numpy(),
+        'value': [x[0] for x in values],
+        'conf': [x[1] for x in values]
+    })
+
+    return fields
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 15 09:41:52 2026
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import os
+import time
+import subprocess
+import pytesseract
+import pandas as pd
+
+from . import TesseractUtils
+
+# the header tesseract writes before TSV rows
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+
+class SubprocessEngine:
+    """Runs one tesseract process per page through pytesseract.
+
+        This is what TesseractUtils does without an engine, and serves as the
+        baseline of benchmark_engines.
+
+        Parameters
+        ----------
+        lang : str, optional
+            The Tesseract language(s), e.g. 'eng'. Defaults to None, using the
+            Tesseract default.
+        config : str, optional
+            Additional Tesseract options, e.g. '--psm 6'. Defaults to ''.
+        """
+    def __init__(self, lang = None, config = ''):
+        self.lang = lang
+        self.config = config
+
+    def images_to_string(self, images):
+        """Get the text of each image, as pytesseract.image_to_string does."""
+        return [str(pytesseract.image_to_string(x, lang = self.lang, config = self.config)) for x in images]
+
+    def images_to_data(self, images):
+        """Get the TSV data of each image, as pytesseract.image_to_data does."""
+        return [pytesseract.image_to_data(x, lang = self.lang, config = self.config) for x in images]
+
+    def close(self):
+        """Release the engine."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class BatchEngine(SubprocessEngine):
+    """Runs one tesseract process per batch of pages.
+
+        Pages are passed to a single tesseract process as an image list, so
+        the process starts and the language model loads once per batch, e.g.
+        once per window of TesseractUtils.iter_pdf_text, rather than once per
+        page. In-memory pages are written as uncompressed PPM files first.
+
+        Parameters
+        ----------
+        lang : str, optional
+            The Tesseract language(s), e.g. 'eng'. Defaults to None, using the
+            Tesseract default.
+        config : str, optional
+            Additional Tesseract options, e.g. '--psm 6'. Defaults to ''.
+        """
+    def run(self, images, extension):
+        """Run tesseract once over a list of images and return its output."""
+        with TemporaryDirectory() as tempdir:
+            # tesseract reads files listed one per line
+            paths = []
+            for i, image in enumerate(images):
+                if isinstance(image, (str, Path)):
+                    paths.append(str(image))
+                else:
+                    paths.append(os.path.join(tempdir, f"page_{i:05}.ppm"))
+                    image.save(paths[-1], "PPM")
+            list_path = os.path.join(tempdir, "images.txt")
+            with open(list_path, 'w', encoding = 'utf-8') as fp:
+                fp.write("\n".join(paths) + "\n")
+
+            cmd = [pytesseract.pytesseract.tesseract_cmd, list_path, 'stdout']
+            if self.lang is not None:
+                cmd = cmd + ['-l', self.lang]
+            cmd = cmd + self.config.split() + extension
+            result = subprocess.run(cmd, capture_output = True, check = True)
+
+        return result.stdout.decode('utf-8')
+
+    def images_to_string(self, images):
+        """Get the text of each image from a single tesseract process."""
+        if len(images) == 0:
+            return []
+        # pages are separated by form feeds
+        pages = self.run(images, []).split('\f')
+
+        return [x + '\f' for x in pages[:len(images)]]
+
+    def images_to_data(self, images):
+        """Get the TSV data of each image from a single tesseract process."""
+        if len(images) == 0:
+            return []
+        lines = self.run(images, ['tsv']).split('\n')
+
+        # split the rows by their page number
+        pages = [[] for _ in images]
+        for line in lines[1:]:
+            if line == '':
+                continue
+            page_num = int(line.split('\t', 2)[1])
+            pages[page_num - 1].append(line + '\n')
+
+        return [TSV_HEADER + ''.join(x) for x in pages]
+
+class TesserocrEngine:
+    """Keeps one Tesseract engine loaded through the tesserocr C API binding.
+
+        The language model loads once when the engine is created, and pages
+        are recognized in memory, with no process starts or temporary files.
+        Requires the optional tesserocr package.
+
+        Parameters
+        ----------
+        lang : str, optional
+            The Tesseract language(s). Defaults to 'eng'.
+        path : str, optional
+            The tessdata folder. Defaults to None, using the tesserocr default.
+        psm : int, optional
+            The Tesseract page segmentation mode. Defaults to None, using the
+            Tesseract default.
+        """
+    def __init__(self, lang = 'eng', path = None, psm = None):
+        import tesserocr
+
+        kwargs = {'lang': lang}
+        if path is not None:
+            kwargs['path'] = path
+        if psm is not None:
+            kwargs['psm'] = psm
+        self.lang = lang
+        self.psm = psm
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+
+    def set_image(self, image):
+        """Hand an image or an image path to the engine."""
+        if isinstance(image, (str, Path)):
+            self.api.SetImageFile(str(image))
+        else:
+            self.api.SetImage(image)
+
+    def images_to_string(self, images):
+        """Get the text of each image from the loaded engine.
+
+            Each text ends with a form feed, as the output of pytesseract does.
+            """
+        pages = []
+        for image in images:
+            self.set_image(image)
+            pages.append(self.api.GetUTF8Text() + '\f')
+
+        return pages
+
+    def images_to_data(self, images):
+        """Get the TSV data of each image from the loaded engine."""
+        pages = []
+        for image in images:
+            self.set_image(image)
+            self.api.Recognize()
+            pages.append(TSV_HEADER + self.api.GetTSVText(0))
+
+        return pages
+
+    def close(self):
+        """Release the engine."""
+        self.api.End()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def benchmark_engines(pdf_path, engines, dpi = 500, output = 'data', window = 8):
+    """Measure the per-page latency of OCR engines.
+
+        Returns a data frame with a row for each engine, giving the number of
+        pages, the total seconds and the seconds per page spent in OCR. Pages
+        are rendered once up front, so only the engines are timed, and are
+        passed to each engine a window at a time.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        engines : dict, required
+            A dictionary of engines keyed by name, e.g.
+            {'subprocess': SubprocessEngine(), 'batch': BatchEngine()}.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        output : str, optional
+            A string 'text' or 'data' representing the result to time.
+            Defaults to 'data'.
+        window : int, optional
+            The number of pages passed to an engine at a time. Defaults to 8.
+        """
+    if output not in ('text', 'data'):
+        raise ValueError("output must be either text or data")
+
+    pages = [x for _, x in TesseractUtils.iter_pdf_pages(pdf_path, dpi = dpi)]
+    results = []
+    for name, engine in engines.items():
+        ocr = engine.images_to_string if output == 'text' else engine.images_to_data
+        start = time.perf_counter()
+        for i in range(0, len(pages), window):
+            ocr(pages[i:i + window])
+        seconds = time.perf_counter() - start
+        results.append([name, len(pages), seconds, seconds/max(len(pages), 1)])
+
+    return pd.DataFrame(results, columns = ['engine', 'pages', 'seconds', 'seconds_per_page'])
@@ -7,23 +7,49 @@ Created on Mon Jul 24 13:09:17 2023
 
 from pathlib import Path
 
+import os
 import sys
 import pytesseract
-import platform
 import io
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, islice
 from tempfile import TemporaryDirectory
-from pdf2image import convert_from_path
-from PIL import Image
+from contextlib import nullcontext
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from . import Instrumentation
 
 # this is a pointer to the module object instance itself
 exe_paths = sys.modules[__name__]
 
 # SET TESSERACT AND POPPLER EXECUTABLES
-exe_paths.tesseract = r"C:\Users\COnnor.gibbs\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
-exe_paths.poppler = r"C:\Users\COnnor.gibbs\AppData\Local\Programs\poppler-23.07.0\Library\bin"
+# from the environment, e.g. TESSERACT_CMD=C:\...\Tesseract-OCR\tesseract.exe and
+# POPPLER_PATH=C:\...\poppler-23.07.0\Library\bin, or set_executable_paths;
+# when unset, both are found on the PATH
+exe_paths.tesseract = os.environ.get('TESSERACT_CMD') or None
+exe_paths.poppler = os.environ.get('POPPLER_PATH') or None
+
+def check_sequential_options(workers = 1, cache = None, use_tempfiles = False, engine = None, window = 1):
+    """Raise a ValueError if options of sequential OCR cannot apply.
+
+        Pool workers and cached pages OCR each page on its own, rendered in
+        memory, so use_tempfiles and window only apply when workers is 1 and
+        there is no cache. A persistent engine lives in this process, so it
+        only applies when workers is 1.
+        """
+    sequential = [
+        name for name, value in (('use_tempfiles', use_tempfiles), ('window', window != 1)) if value
+    ]
+    if workers != 1:
+        sequential = (['engine'] if engine is not None else []) + sequential
+        if sequential:
+            raise ValueError(f"workers must be 1 to use {' and '.join(sequential)}")
+    if cache is not None and sequential:
+        raise ValueError(f"{' and '.join(sequential)} cannot be used with a cache")
 
-def extract_pdf_text(pdf_path):
+def extract_pdf_text(pdf_path, workers = 1, use_tempfiles = False, cache = None, engine = None, window = 1, 
+                     preprocess = None, grayscale = False):
     """Convert pdf to list of lists of strings.
 
         Returns a list of lists of strings. The outer list enumerates the pages 
@@ -35,58 +61,58 @@ def extract_pdf_text(pdf_path):
         ----------
         pdf_path : str, required
             The absolute path of a pdf document.
+        workers : int, optional
+            The number of processes over which pages are OCRed. If None, one
+            process per core is used. Defaults to 1, OCRing pages one after 
+            another in this process. Only 1 allows use_tempfiles, engine and
+            window, raising a ValueError otherwise.
+        use_tempfiles : bool, optional
+            A boolean whether pages are rendered to lossless temporary files 
+            that Tesseract reads directly, rather than held in memory. Defaults
+            to False.
+        cache : ResultCache, optional
+            A cache of page results. Only pages missing from the cache are 
+            rendered and OCRed, one at a time, so use_tempfiles and window
+            raise a ValueError with a cache. Defaults to None.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, kept loaded across 
+            pages, for sequential OCR. Defaults to None, running one tesseract
+            process per page through pytesseract.
+        window : int, optional
+            The number of pages rendered, and handed to the engine, at a time.
+            Defaults to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
         """
-    # get output directory and poppler path by platform
-    if platform.system() == "Windows":
-        pytesseract.pytesseract.tesseract_cmd = exe_paths.tesseract
-        path_to_poppler_exe = Path(exe_paths.poppler)
-        
-    # get pdf file as path
-    pdf_path = Path(pdf_path)
+    check_sequential_options(workers, cache, use_tempfiles, engine, window)
+    if cache is not None:
+        return cached_pdf_pages(
+            pdf_path, cache, output = 'text', workers = workers, 
+            preprocess = preprocess, grayscale = grayscale, engine = engine
+        )
     
-    # store all pages of the pdf in a list
-    image_file_list = []
+    if workers != 1:
+        return map_pdf_pages(
+            [pdf_path], output = 'text', workers = workers, 
+            preprocess = preprocess, grayscale = grayscale
+        )[0]
     
-    # start converting, holding temporary images
-    with TemporaryDirectory() as tempdir:
-        # convert pdf to images at 500 DPI
-        if platform.system() == "Windows":
-            pdf_pages = convert_from_path(
-                pdf_path, 500, poppler_path = path_to_poppler_exe
-            )
-        else:
-            pdf_pages = convert_from_path(pdf_path, 500)
-            
-        """
-        Part #1 : Converting PDF to images
-        """
- 
-        # iterate through all the pages stored above
-        for page_enumeration, page in enumerate(pdf_pages, start = 1):
- 
-            # create a file name to store the image
-            filename = f"{tempdir}\page_{page_enumeration:03}.jpg"
- 
-            # save the image of the page in system
-            page.save(filename, "JPEG")
-            image_file_list.append(filename)
- 
-        """
-        Part #2 - Recognizing text from the images using OCR
-        """
-        
-        txt_list = []
-        # iterate from 1 to total number of pages
-        for image_file in image_file_list:
-            # recognize the text as string in image using pytesserct
-            text = str(pytesseract.image_to_string(Image.open(image_file)))
-            
-            # write the entire pdf to a list
-            txt_list.append(text)
+    # let poppler write lossless pages for tesseract to read, if requested
+    with TemporaryDirectory() if use_tempfiles else nullcontext() as tempdir:
+        # recognize the text as string in each page using pytesseract
+        txt_list = list(iter_pdf_text(
+            pdf_path, window = window, output_folder = tempdir, engine = engine, 
+            preprocess = preprocess, grayscale = grayscale
+        ))
                 
     return txt_list
 
-def extract_pdf_data(pdf_path):
+def extract_pdf_data(pdf_path, workers = 1, use_tempfiles = False, cache = None, engine = None, window = 1, 
+                     preprocess = None, grayscale = False):
     """Convert pdf to a dataframe.
 
         Returns a dataframe containing box boundaries, confidences, and other 
@@ -111,58 +137,806 @@ def extract_pdf_data(pdf_path):
         ----------
         pdf_path : str, required
             The absolute path of a pdf document.
+        workers : int, optional
+            The number of processes over which pages are OCRed. If None, one
+            process per core is used. Defaults to 1, OCRing pages one after 
+            another in this process. Only 1 allows use_tempfiles, engine and
+            window, raising a ValueError otherwise.
+        use_tempfiles : bool, optional
+            A boolean whether pages are rendered to lossless temporary files 
+            that Tesseract reads directly, rather than held in memory. Defaults
+            to False.
+        cache : ResultCache, optional
+            A cache of page results. Only pages missing from the cache are 
+            rendered and OCRed, one at a time, so use_tempfiles and window
+            raise a ValueError with a cache. Defaults to None.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, kept loaded across 
+            pages, for sequential OCR. Defaults to None, running one tesseract
+            process per page through pytesseract.
+        window : int, optional
+            The number of pages rendered, and handed to the engine, at a time.
+            Defaults to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
         """
-    if platform.system() == "Windows":
+    check_sequential_options(workers, cache, use_tempfiles, engine, window)
+    if cache is not None:
+        return pd.concat(cached_pdf_pages(
+            pdf_path, cache, output = 'data', workers = workers, 
+            preprocess = preprocess, grayscale = grayscale, engine = engine
+        ))
+    
+    if workers != 1:
+        return pd.concat(map_pdf_pages(
+            [pdf_path], output = 'data', workers = workers, 
+            preprocess = preprocess, grayscale = grayscale
+        )[0])
+    
+    # let poppler write lossless pages for tesseract to read, if requested
+    with TemporaryDirectory() if use_tempfiles else nullcontext() as tempdir:
+        # recognize the data in each page using pytesseract
+        data = pd.concat(iter_pdf_data(
+            pdf_path, window = window, output_folder = tempdir, engine = engine, 
+            preprocess = preprocess, grayscale = grayscale
+        ))
+        
+    return data
+
+def set_executable_paths(tesseract = None, poppler = None):
+    """Set the Tesseract executable and the poppler binary folder.
+
+        Overrides the TESSERACT_CMD and POPPLER_PATH environment variables for
+        this process. Worker processes started afterwards inherit the paths
+        through the environment.
+
+        Parameters
+        ----------
+        tesseract : str, optional
+            The path of the tesseract executable. Defaults to None, leaving it
+            unchanged.
+        poppler : str, optional
+            The folder of the poppler binaries, e.g. pdftoppm. Defaults to
+            None, leaving it unchanged.
+        """
+    if tesseract is not None:
+        exe_paths.tesseract = os.environ['TESSERACT_CMD'] = str(tesseract)
+    if poppler is not None:
+        exe_paths.poppler = os.environ['POPPLER_PATH'] = str(poppler)
+
+def get_poppler_path():
+    """Point pytesseract at its executable and get the poppler path.
+
+        Returns the poppler binary folder set by POPPLER_PATH or
+        set_executable_paths, or None, in which case poppler is found on the
+        PATH.
+        """
+    if exe_paths.tesseract is not None:
         pytesseract.pytesseract.tesseract_cmd = exe_paths.tesseract
-        path_to_poppler_exe = Path(exe_paths.poppler)
-            
+    
+    return None if exe_paths.poppler is None else Path(exe_paths.poppler)
+
+def get_pages_bytes(pages):
+    """Get the size in bytes of rendered pages, in memory or written to files."""
+    size = 0
+    for page in pages:
+        if isinstance(page, (str, Path)):
+            size = size + os.path.getsize(page)
+        else:
+            size = size + page.width * page.height * len(page.getbands())
+    
+    return size
+
+def parse_page_data(data, page_num):
+    """Structures the Tesseract TSV output of a page into a dataframe.
+
+        Returns a dataframe with the columns described in extract_pdf_data.
+
+        Parameters
+        ----------
+        data : str, required
+            The TSV output of pytesseract.image_to_data for a page.
+        page_num : int, required
+            The page number of the page.
+        """
+    # create a tsv like file and read as pandas
+    with Instrumentation.stage('parse_tsv', page = page_num, bytes = len(data)):
+        data = io.StringIO(data)
+        data = pd.read_csv(data, sep='\t', lineterminator='\n', dtype = {'text': str})
+        data['page_num'] = page_num
+    
+    return data
+
+def iter_pdf_pages(pdf_path, dpi = 500, window = 1, output_folder = None, fmt = 'ppm', 
+                   preprocess = None, grayscale = False):
+    """Lazily convert the pages of a pdf to images.
+
+        Yields tuples of the page number and the page as a PIL image. Pages are
+        rendered a window at a time using page ranges, so no more than window 
+        pages are held in memory at once no matter the length of the pdf. 
+        Pages are never encoded lossily; in memory, pytesseract hands them to 
+        Tesseract in their uncompressed rendered format.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        window : int, optional
+            The number of pages rendered at a time. Defaults to 1.
+        output_folder : str, optional
+            A folder to which poppler writes the pages. If given, the paths of
+            the written pages are yielded in place of images, and the files of 
+            a window are removed once the next window is requested. Defaults to
+            None, holding pages in memory.
+        fmt : str, optional
+            A lossless format 'ppm', 'png' or 'tiff' in which pages are written
+            to output_folder. Defaults to 'ppm'.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            page before it is yielded. Written pages are preprocessed in place.
+            Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale, which is 
+            cheaper to render and hold than colour. Defaults to False.
+        """
+    if window < 1:
+        raise ValueError("window must be a positive integer")
+    if fmt not in ('ppm', 'png', 'tiff'):
+        raise ValueError("fmt must be either ppm, png or tiff")
+    
+    poppler_path = get_poppler_path()
+    
     # get pdf file as path
     pdf_path = Path(pdf_path)
+    n_pages = pdfinfo_from_path(pdf_path, poppler_path = poppler_path)['Pages']
     
-    # store all pages of the pdf in a list
-    image_file_list = []
-    
-    # start converting, holding temporary images
-    with TemporaryDirectory() as tempdir:
-        # convert pdf to images at 500 DPI
-        if platform.system() == "Windows":
+    # convert one window of pages at a time
+    for first_page in range(1, n_pages + 1, window):
+        last_page = min(first_page + window - 1, n_pages)
+        pages = last_page - first_page + 1
+        with Instrumentation.stage('render', page = first_page, pages = pages) as record:
             pdf_pages = convert_from_path(
-                pdf_path, 500, poppler_path = path_to_poppler_exe
+                pdf_path, dpi, first_page = first_page, last_page = last_page, 
+                output_folder = output_folder, fmt = fmt, grayscale = grayscale,
+                paths_only = output_folder is not None, poppler_path = poppler_path
             )
+            if record is not None:
+                record['bytes'] = get_pages_bytes(pdf_pages)
+        for page_num, page in enumerate(pdf_pages, start = first_page):
+            if preprocess is not None:
+                with Instrumentation.stage('preprocess', page = page_num, pages = 1):
+                    page = preprocess(page)
+            yield page_num, page
+        
+        # written pages are no longer needed once read
+        if output_folder is not None:
+            for page in pdf_pages:
+                os.remove(page)
+        
+        # release the window before rendering the next one
+        del pdf_pages
+
+def iter_pdf_text(pdf_path, dpi = 500, window = 1, output_folder = None, engine = None, 
+                  preprocess = None, grayscale = False):
+    """Lazily convert pdf pages to strings.
+
+        Yields the inferred text of each page of the pdf, as extract_pdf_text
+        does for the whole pdf, keeping no more than window pages in memory.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        window : int, optional
+            The number of pages rendered at a time. Defaults to 1.
+        output_folder : str, optional
+            A folder to which pages are written as lossless files for Tesseract
+            to read directly. Defaults to None, holding pages in memory.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, which is handed a 
+            window of pages at a time. Defaults to None, running one tesseract
+            process per page through pytesseract.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        """
+    pdf_pages = iter_pdf_pages(
+        pdf_path, dpi = dpi, window = window, output_folder = output_folder, 
+        preprocess = preprocess, grayscale = grayscale
+    )
+    if engine is None:
+        for page_num, page in pdf_pages:
+            with Instrumentation.stage('tesseract', page = page_num, pages = 1):
+                text = str(pytesseract.image_to_string(page))
+            yield text
+        return
+    
+    # hand the engine a window of pages at a time
+    for pages in iter(lambda: list(islice(pdf_pages, window)), []):
+        with Instrumentation.stage('tesseract', page = pages[0][0], pages = len(pages)):
+            texts = engine.images_to_string([x for _, x in pages])
+        yield from texts
+
+def iter_pdf_data(pdf_path, dpi = 500, window = 1, output_folder = None, engine = None, 
+                  preprocess = None, grayscale = False):
+    """Lazily convert pdf pages to dataframes.
+
+        Yields a dataframe for each page of the pdf, with the columns described
+        in extract_pdf_data, keeping no more than window pages in memory.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        window : int, optional
+            The number of pages rendered at a time. Defaults to 1.
+        output_folder : str, optional
+            A folder to which pages are written as lossless files for Tesseract
+            to read directly. Defaults to None, holding pages in memory.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, which is handed a 
+            window of pages at a time. Defaults to None, running one tesseract
+            process per page through pytesseract.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        """
+    pdf_pages = iter_pdf_pages(
+        pdf_path, dpi = dpi, window = window, output_folder = output_folder, 
+        preprocess = preprocess, grayscale = grayscale
+    )
+    if engine is None:
+        for page_num, page in pdf_pages:
+            with Instrumentation.stage('tesseract', page = page_num, pages = 1):
+                data = pytesseract.image_to_data(page)
+            yield parse_page_data(data, page_num)
+        return
+    
+    # hand the engine a window of pages at a time
+    for pages in iter(lambda: list(islice(pdf_pages, window)), []):
+        with Instrumentation.stage('tesseract', page = pages[0][0], pages = len(pages)):
+            data = engine.images_to_data([x for _, x in pages])
+        for (page_num, _), x in zip(pages, data):
+            yield parse_page_data(x, page_num)
+
+def init_ocr_worker(omp_thread_limit = 1):
+    """Limit the OpenMP threads Tesseract uses in an OCR worker process.
+
+        Parameters
+        ----------
+        omp_thread_limit : int, optional
+            The number of OpenMP threads each Tesseract call may use. Defaults
+            to 1, so that parallelism comes from the worker processes alone.
+        """
+    os.environ['OMP_THREAD_LIMIT'] = str(omp_thread_limit)
+
+def ocr_pdf_page(pdf_path, page_num, dpi = 500, output = 'text', preprocess = None, grayscale = False, 
+                 engine = None):
+    """Convert a single pdf page to a string or a dataframe.
+
+        Returns the inferred text of the page if output is 'text', a dataframe
+        with the columns described in extract_pdf_data if output is 'data', or
+        a tuple of both from a single Tesseract run if output is 'both'. Only 
+        the requested page is rendered, so workers never hold the whole pdf.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        dpi : int, optional
+            The resolution at which the page is rendered. Defaults to 500.
+        output : str, optional
+            A string 'text', 'data' or 'both' representing the result to 
+            return. Defaults to 'text'.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, for output 'text' or
+            'data'. Defaults to None, running tesseract through pytesseract.
+        """
+    if output not in ('text', 'data', 'both'):
+        raise ValueError("output must be either text, data or both")
+    if engine is not None and output == 'both':
+        raise ValueError("output both requires engine to be None")
+    
+    poppler_path = get_poppler_path()
+    with Instrumentation.stage('render', page = page_num, pages = 1) as record:
+        page = convert_from_path(
+            Path(pdf_path), dpi, first_page = page_num, last_page = page_num, 
+            grayscale = grayscale, poppler_path = poppler_path
+        )[0]
+        if record is not None:
+            record['bytes'] = get_pages_bytes([page])
+    if preprocess is not None:
+        with Instrumentation.stage('preprocess', page = page_num, pages = 1):
+            page = preprocess(page)
+    
+    if output == 'both':
+        return ocr_page_text_and_data(page, page_num)
+    with Instrumentation.stage('tesseract', page = page_num, pages = 1):
+        if engine is not None:
+            if output == 'text':
+                return engine.images_to_string([page])[0]
+            data = engine.images_to_data([page])[0]
+        elif output == 'text':
+            return str(pytesseract.image_to_string(page))
         else:
-            pdf_pages = convert_from_path(pdf_path, 500)
-            
+            data = pytesseract.image_to_data(page)
+    
+    return parse_page_data(data, page_num)
+
+def map_pages(pdf_paths, page_nums, dpi = 500, output = 'text', workers = None, omp_thread_limit = 1, 
+              preprocess = None, grayscale = False):
+    """OCR pdf pages across a process pool.
+
+        Returns a list with the result of ocr_pdf_page for each pair of pdf 
+        path and page number, in the order given.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of absolute paths of pdf documents, one for each page.
+        page_nums : list, required
+            A list of page numbers, starting at 1.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        output : str, optional
+            A string 'text', 'data' or 'both' representing the result to 
+            return. Defaults to 'text'.
+        workers : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
+        omp_thread_limit : int, optional
+            The number of OpenMP threads each Tesseract call may use. Defaults
+            to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
         """
-        Part #1 : Converting PDF to images
+    # results come back in task order
+    with ProcessPoolExecutor(
+        max_workers = workers, initializer = init_ocr_worker, 
+        initargs = (omp_thread_limit,)
+    ) as executor:
+        results = list(executor.map(
+            ocr_pdf_page, pdf_paths, page_nums, repeat(dpi), repeat(output), 
+            repeat(preprocess), repeat(grayscale)
+        ))
+    
+    return results
+
+def map_pdf_pages(pdf_paths, dpi = 500, output = 'text', workers = None, omp_thread_limit = 1, 
+                  preprocess = None, grayscale = False):
+    """OCR the pages of several pdfs across a process pool.
+
+        Returns a list of lists. The outer list enumerates the pdfs in the order
+        given, and the inner list enumerates the results of ocr_pdf_page for 
+        each page of that pdf in page order. Pages of all pdfs are fanned out
+        to the pool together, so short documents do not leave workers idle.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of absolute paths of pdf documents.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        output : str, optional
+            A string 'text', 'data' or 'both' representing the result to 
+            return. Defaults to 'text'.
+        workers : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
+        omp_thread_limit : int, optional
+            The number of OpenMP threads each Tesseract call may use. Defaults
+            to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
         """
- 
-        # iterate through all the pages stored above
-        for page_enumeration, page in enumerate(pdf_pages, start = 1):
- 
-            # create a file name to store the image
-            filename = f"{tempdir}\page_{page_enumeration:03}.jpg"
- 
-            # save the image of the page in system
-            page.save(filename, "JPEG")
-            image_file_list.append(filename)
- 
+    if output not in ('text', 'data', 'both'):
+        raise ValueError("output must be either text, data or both")
+    
+    poppler_path = get_poppler_path()
+    pdf_paths = [Path(x) for x in pdf_paths]
+    n_pages = [pdfinfo_from_path(x, poppler_path = poppler_path)['Pages'] for x in pdf_paths]
+    
+    # one task per page of every pdf
+    task_paths = [x for x, n in zip(pdf_paths, n_pages) for _ in range(n)]
+    task_pages = [page_num for n in n_pages for page_num in range(1, n + 1)]
+    results = map_pages(
+        task_paths, task_pages, dpi = dpi, output = output, workers = workers,
+        omp_thread_limit = omp_thread_limit, preprocess = preprocess, grayscale = grayscale
+    )
+    
+    # regroup by pdf
+    pdf_results = []
+    start = 0
+    for n in n_pages:
+        pdf_results.append(results[start:start + n])
+        start = start + n
+    
+    return pdf_results
+
+def extract_pdf_text_batch(pdf_paths, workers = None):
+    """Convert several pdfs to lists of strings in parallel.
+
+        Returns a list with the result of extract_pdf_text for each pdf, in 
+        the order given.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of absolute paths of pdf documents.
+        workers : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
         """
-        Part #2 - Recognizing text from the images using OCR
+    return map_pdf_pages(pdf_paths, output = 'text', workers = workers)
+
+def extract_pdf_data_batch(pdf_paths, workers = None):
+    """Convert several pdfs to dataframes in parallel.
+
+        Returns a list with the result of extract_pdf_data for each pdf, in 
+        the order given.
+
+        Parameters
+        ----------
+        pdf_paths : list, required
+            A list of absolute paths of pdf documents.
+        workers : int, optional
+            The number of worker processes. If None, one process per core is
+            used. Defaults to None.
         """
-        
-        data_list = []
-        for image_file_num, image_file in enumerate(image_file_list, start = 1):
-            # recognize the text as string in image using pytesserct
-            data = pytesseract.image_to_data(Image.open(image_file))
-            
-            # create a tsv like file and read as pandas
-            data = io.StringIO(data)
-            data = pd.read_csv(data, sep='\t', lineterminator='\n')
-            data['page_num'] = image_file_num
-            
-            # write the data as a list
-            data_list.append(data)
-            
-        data = pd.concat(data_list)
-        
-    return data
+    pdf_results = map_pdf_pages(pdf_paths, output = 'data', workers = workers)
+    
+    return [pd.concat(x) for x in pdf_results]
+
+def cached_pdf_pages(pdf_path, cache, dpi = 500, output = 'text', workers = 1, preprocess = None, grayscale = False, 
+                     engine = None):
+    """OCR the pages of a pdf through a result cache.
+
+        Returns a list with the result of ocr_pdf_page for each page of the pdf
+        in page order. Pages are keyed by the content hash of the pdf, the page
+        number, the dpi, the Tesseract version and the engine, and only pages 
+        missing from the cache are rendered and OCRed.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        cache : ResultCache, required
+            A cache of page results.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        output : str, optional
+            A string 'text' or 'data' representing the result to return. 
+            Defaults to 'text'.
+        workers : int, optional
+            The number of processes over which missing pages are OCRed. If 
+            None, one process per core is used. Defaults to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Its steps are part of the cache key. 
+            Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, which OCRs missing
+            pages in this process. Its class and settings are part of the 
+            cache key. Defaults to None, using pytesseract.
+        """
+    poppler_path = get_poppler_path()
+    n_pages = pdfinfo_from_path(Path(pdf_path), poppler_path = poppler_path)['Pages']
+    
+    # look up every page
+    settings = {'dpi': dpi, 'tesseract': str(pytesseract.get_tesseract_version())}
+    if preprocess is not None:
+        settings['preprocess'] = preprocess.settings()
+    if grayscale:
+        settings['grayscale'] = True
+    if engine is not None:
+        settings['engine'] = [type(engine).__name__, {
+            k: v for k, v in vars(engine).items() if isinstance(v, (str, int, float, bool, type(None)))
+        }]
+    keys = [
+        cache.make_key(pdf_path, 'tesseract_' + output, page_num, **settings)
+        for page_num in range(1, n_pages + 1)
+    ]
+    results = [cache.get(x) for x in keys]
+    missing = [page_num for page_num, x in enumerate(results, start = 1) if x is None]
+    
+    # OCR the missing pages
+    if engine is not None:
+        fresh = [ocr_pdf_page(pdf_path, x, dpi, output, preprocess, grayscale, engine) for x in missing]
+    elif workers != 1 and len(missing) > 1:
+        fresh = map_pages(
+            [pdf_path] * len(missing), missing, dpi = dpi, output = output, workers = workers, 
+            preprocess = preprocess, grayscale = grayscale
+        )
+    else:
+        fresh = [ocr_pdf_page(pdf_path, x, dpi, output, preprocess, grayscale) for x in missing]
+    
+    for page_num, result in zip(missing, fresh):
+        cache.put(keys[page_num - 1], result)
+        results[page_num - 1] = result
+    
+    return results
+
+def get_page_confidence(data):
+    """Summarizes the confidence of the Tesseract data of a page.
+
+        Returns the mean confidence of the words detected on the page, or 0 if
+        no words were detected.
+
+        Parameters
+        ----------
+        data : dataframe, required
+            The Tesseract data of a page, as returned by parse_page_data.
+        """
+    words = data[(data['conf'] >= 0) & data['text'].notna()]
+    words = words[words['text'].str.strip() != '']
+    if words.shape[0] == 0:
+        return 0.0
+    
+    return float(words['conf'].mean())
+
+def ocr_pdf_page_adaptive(pdf_path, page_num, dpis = (200, 300, 500), min_conf = 80):
+    """Convert a single pdf page to a dataframe at the lowest sufficient dpi.
+
+        Returns a tuple of the Tesseract data of the page, the dpi it was 
+        rendered at, and its mean word confidence. The page is OCRed at each 
+        dpi in turn, stopping at the first whose mean word confidence reaches 
+        min_conf, or at the last dpi. The data gains a `dpi` column, since its
+        pixel coordinates depend on it.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        page_num : int, required
+            The page number of the page, starting at 1.
+        dpis : tuple, optional
+            The resolutions to try, in increasing order. Defaults to 
+            (200, 300, 500).
+        min_conf : float, optional
+            The mean word confidence, from 0 to 100, at which a resolution is 
+            accepted. Defaults to 80.
+        """
+    if len(dpis) == 0:
+        raise ValueError("dpis must not be empty")
+    
+    for dpi in dpis:
+        data = ocr_pdf_page(pdf_path, page_num, dpi = dpi, output = 'data')
+        conf = get_page_confidence(data)
+        if conf >= min_conf:
+            break
+    data['dpi'] = dpi
+    
+    return data, dpi, conf
+
+def extract_pdf_data_adaptive(pdf_path, dpis = (200, 300, 500), min_conf = 80, workers = 1):
+    """Convert pdf to a dataframe, rendering each page at an adaptive dpi.
+
+        Returns a tuple of a dataframe and a report. The dataframe has the 
+        columns described in extract_pdf_data and a `dpi` column giving the 
+        resolution of each page's pixel coordinates. The report has a row for
+        each page with the columns `page_num`, `dpi`, `conf` and `attempts`, 
+        to tune min_conf against throughput. Pages are first OCRed at the 
+        lowest dpi, and only pages whose mean word confidence falls below 
+        min_conf are rendered and OCRed again at higher dpis.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpis : tuple, optional
+            The resolutions to try, in increasing order. Defaults to 
+            (200, 300, 500).
+        min_conf : float, optional
+            The mean word confidence, from 0 to 100, at which a resolution is 
+            accepted. Defaults to 80.
+        workers : int, optional
+            The number of processes over which pages are OCRed. If None, one
+            process per core is used. Defaults to 1.
+        """
+    dpis = sorted(dpis)
+    if len(dpis) == 0:
+        raise ValueError("dpis must not be empty")
+    poppler_path = get_poppler_path()
+    n_pages = pdfinfo_from_path(Path(pdf_path), poppler_path = poppler_path)['Pages']
+    page_nums = list(range(1, n_pages + 1))
+    
+    if workers != 1:
+        with ProcessPoolExecutor(max_workers = workers, initializer = init_ocr_worker) as executor:
+            results = list(executor.map(
+                ocr_pdf_page_adaptive, repeat(pdf_path), page_nums, repeat(dpis), 
+                repeat(min_conf)
+            ))
+    else:
+        results = [ocr_pdf_page_adaptive(pdf_path, x, dpis, min_conf) for x in page_nums]
+    
+    # combine
+    data = pd.concat([x[0] for x in results])
+    report = pd.DataFrame(
+        [[page_num, dpi, conf, dpis.index(dpi) + 1] for page_num, (_, dpi, conf) in zip(page_nums, results)],
+        columns = ['page_num', 'dpi', 'conf', 'attempts']
+    )
+    
+    return data, report
+
+def get_page_text(data):
+    """Rebuild the text of a page from its Tesseract data.
+
+        Returns a string laid out as Tesseract lays out plain text: the words
+        of a line joined by spaces, lines by new lines, paragraphs and blocks 
+        by blank lines, and a closing form feed.
+
+        Parameters
+        ----------
+        data : dataframe, required
+            The Tesseract data of a page, as returned by parse_page_data.
+        """
+    words = data[(data['level'] == 5) & data['text'].notna()]
+    words = words[words['text'].str.strip() != '']
+    if words.shape[0] == 0:
+        return '\f'
+    
+    # words to lines, lines to paragraphs
+    lines = words.groupby(['block_num', 'par_num', 'line_num'], sort = False)['text'].agg(' '.join)
+    pars = lines.groupby(level = ['block_num', 'par_num'], sort = False).agg('\n'.join)
+    
+    return '\n\n'.join(pars) + '\n\f'
+
+def ocr_page_text_and_data(page, page_num, engine = None):
+    """Convert a page image to a string and a dataframe in one Tesseract run.
+
+        Returns a tuple of the inferred text of the page and a dataframe with 
+        the columns described in extract_pdf_data. Without an engine, a single
+        tesseract process writes both its text and its TSV output. With an 
+        engine, the text is rebuilt from the TSV data with get_page_text.
+
+        Parameters
+        ----------
+        page : image, required
+            A PIL image or the path of an image of the page.
+        page_num : int, required
+            The page number of the page.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines. Defaults to None.
+        """
+    with Instrumentation.stage('tesseract', page = page_num, pages = 1):
+        if engine is None:
+            text, data = pytesseract.run_and_get_multiple_output(page, extensions = ['txt', 'tsv'])
+        else:
+            data = engine.images_to_data([page])[0]
+    if engine is None:
+        return text, parse_page_data(data, page_num)
+    
+    data = parse_page_data(data, page_num)
+    
+    return get_page_text(data), data
+
+def iter_pdf_text_and_data(pdf_path, dpi = 500, window = 1, output_folder = None, engine = None, 
+                           preprocess = None, grayscale = False):
+    """Lazily convert pdf pages to strings and dataframes at once.
+
+        Yields a tuple of the text and the dataframe of each page of the pdf,
+        as iter_pdf_text and iter_pdf_data do, rendering and OCRing each page 
+        only once.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        dpi : int, optional
+            The resolution at which pages are rendered. Defaults to 500.
+        window : int, optional
+            The number of pages rendered at a time. Defaults to 1.
+        output_folder : str, optional
+            A folder to which pages are written as lossless files for Tesseract
+            to read directly. Defaults to None, holding pages in memory.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, which is handed a 
+            window of pages at a time. Defaults to None.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        """
+    if engine is None:
+        pdf_pages = iter_pdf_pages(
+            pdf_path, dpi = dpi, window = window, output_folder = output_folder, 
+            preprocess = preprocess, grayscale = grayscale
+        )
+        for page_num, page in pdf_pages:
+            yield ocr_page_text_and_data(page, page_num)
+        return
+    
+    pdf_data = iter_pdf_data(
+        pdf_path, dpi = dpi, window = window, output_folder = output_folder, 
+        engine = engine, preprocess = preprocess, grayscale = grayscale
+    )
+    for data in pdf_data:
+        yield get_page_text(data), data
+
+def extract_pdf_text_and_data(pdf_path, workers = 1, use_tempfiles = False, engine = None, window = 1, 
+                              preprocess = None, grayscale = False):
+    """Convert pdf to a list of strings and a dataframe in a single pass.
+
+        Returns a tuple of the results of extract_pdf_text and 
+        extract_pdf_data, while rendering and OCRing each page only once 
+        rather than once per function.
+
+        Parameters
+        ----------
+        pdf_path : str, required
+            The absolute path of a pdf document.
+        workers : int, optional
+            The number of processes over which pages are OCRed. If None, one
+            process per core is used. Defaults to 1. Only 1 allows
+            use_tempfiles, engine and window, raising a ValueError otherwise.
+        use_tempfiles : bool, optional
+            A boolean whether pages are rendered to lossless temporary files 
+            that Tesseract reads directly, rather than held in memory. Defaults
+            to False.
+        engine : engine, optional
+            A persistent OCR engine from TesseractEngines, for sequential OCR.
+            Defaults to None.
+        window : int, optional
+            The number of pages rendered, and handed to the engine, at a time.
+            Defaults to 1.
+        preprocess : callable, optional
+            A preprocessing pipeline from ImagePreprocessing, applied to each 
+            rendered page before OCR. Defaults to None.
+        grayscale : bool, optional
+            A boolean whether poppler renders pages in grayscale. Defaults to 
+            False.
+        """
+    check_sequential_options(workers, None, use_tempfiles, engine, window)
+    if workers != 1:
+        results = map_pdf_pages(
+            [pdf_path], output = 'both', workers = workers, 
+            preprocess = preprocess, grayscale = grayscale
+        )[0]
+    else:
+        with TemporaryDirectory() if use_tempfiles else nullcontext() as tempdir:
+            results = list(iter_pdf_text_and_data(
+                pdf_path, window = window, output_folder = tempdir, engine = engine, 
+                preprocess = preprocess, grayscale = grayscale
+            ))
+    
+    txt_list = [x[0] for x in results]
+    data = pd.concat([x[1] for x in results])
+    
+    return txt_list, data